@@ -0,0 +1,188 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from token_budget import TokenBudgetExceeded, get_budget
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+ANALYSIS_MAX_TOKENS = 800
+
+ANALYSIS_SYSTEM_PROMPT = "You are a professional business analyst and marketing consultant. Provide clear, actionable insights based on business information."
+
+
+def build_analysis_messages(final_prompt):
+    """Chat messages asking for the business analysis of a rendered prompt"""
+    test_prompt = f"""
+Based on the following business information, provide a comprehensive analysis and suggestions:
+
+{final_prompt}
+
+Please provide:
+1. Business Overview (2-3 sentences)
+2. Key Strengths (3-4 points)
+3. Marketing Suggestions (3-4 ideas)
+4. Potential Improvements (2-3 suggestions)
+5. Target Audience Analysis (1-2 sentences)
+
+Format your response professionally with clear sections.
+"""
+    return [
+        {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+        {"role": "user", "content": test_prompt}
+    ]
+
+
+# Fixed lead-in of every compact request; the business data always comes last so requests
+# stay uniform and their outputs comparable across businesses
+COMPACT_ANALYSIS_INSTRUCTIONS = """Based on the business profile at the end of this message, provide a comprehensive analysis and suggestions.
+The profile lists only the fields that were found, one "field: value" per line.
+
+Please provide:
+1. Business Overview (2-3 sentences)
+2. Key Strengths (3-4 points)
+3. Marketing Suggestions (3-4 ideas)
+4. Potential Improvements (2-3 suggestions)
+5. Target Audience Analysis (1-2 sentences)
+
+Format your response professionally with clear sections.
+
+Business profile:
+"""
+
+# "compact" sends only the populated profile fields; "template" sends the full rendered prompt
+ANALYSIS_MODES = ("compact", "template")
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "compact")
+
+
+def compact_profile(profile):
+    """Populated fields only, one "field: value" line each"""
+    return "\n".join(f"{k}: {v}" for k, v in profile.items() if v and v != "Not available")
+
+
+def build_compact_analysis_messages(profile):
+    """Chat messages asking for the business analysis of a profile's populated fields"""
+    return [
+        {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+        {"role": "user", "content": COMPACT_ANALYSIS_INSTRUCTIONS + compact_profile(profile)}
+    ]
+
+
+def analysis_messages(final_prompt, profile=None, mode=ANALYSIS_MODE):
+    """Messages for the chosen mode; falls back to the rendered prompt when no profile is at hand"""
+    if mode == "compact" and profile is not None:
+        return build_compact_analysis_messages(profile)
+    return build_analysis_messages(final_prompt)
+
+
+def run_analysis(messages, model="gpt-3.5-turbo"):
+    """Send one analysis request; never raises, errors are reported in the result"""
+    import openai
+    openai.api_key = OPENAI_API_KEY
+
+    result = {"model": model, "response": None, "error": None, "latency_seconds": None,
+              "prompt_tokens": None, "completion_tokens": None, "total_tokens": None}
+    budget = get_budget()
+    started = time.perf_counter()
+    try:
+        reserved = budget.preflight(messages, model, ANALYSIS_MAX_TOKENS) + ANALYSIS_MAX_TOKENS
+    except TokenBudgetExceeded as e:
+        result["error"] = f"Token budget exceeded: {e}"
+        return result
+    try:
+        response = openai.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=ANALYSIS_MAX_TOKENS,
+            temperature=0.7
+        )
+    except Exception as e:
+        budget.release(reserved)
+        result["error"] = str(e)
+        return result
+    budget.record(response.usage.total_tokens, reserved)
+
+    result["latency_seconds"] = time.perf_counter() - started
+    result["response"] = response.choices[0].message.content
+    result["prompt_tokens"] = response.usage.prompt_tokens
+    result["completion_tokens"] = response.usage.completion_tokens
+    result["total_tokens"] = response.usage.total_tokens
+    return result
+
+
+def fan_out(prompts, models, max_workers=8, build=build_analysis_messages):
+    """Run every (template, model) pair concurrently from one scrape
+
+    prompts maps a template name to its rendered prompt (or, with
+    build=build_compact_analysis_messages, to a profile). Returns one result per pair,
+    in template-then-model order, each tagged with its "template".
+    """
+    jobs = [(name, model) for name in prompts for model in models]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs)) or 1) as pool:
+        futures = [pool.submit(run_analysis, build(prompts[name]), model) for name, model in jobs]
+        results = [future.result() for future in futures]
+    for (name, _), result in zip(jobs, results):
+        result["template"] = name
+    return results
+
+
+def render_templates(scraped_data, template_files):
+    """Render one profile against several templates; returns {template_file: final_prompt}"""
+    from generate_prompt import load_template, map_scraped_data_to_template, replace_placeholders
+
+    data_mapping = map_scraped_data_to_template(scraped_data)
+    prompts = {}
+    for template_file in template_files:
+        template = load_template(template_file)
+        if template:
+            prompts[template_file] = replace_placeholders(template, data_mapping)
+    return prompts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare templates and models on a single scrape")
+    parser.add_argument("url")
+    parser.add_argument("--templates", nargs="+", default=["prompt_template.txt"])
+    parser.add_argument("--models", nargs="+", default=["gpt-3.5-turbo", "gpt-4", "gpt-4-turbo"])
+    parser.add_argument("--output-dir", default="analysis_results")
+    parser.add_argument("--mode", choices=ANALYSIS_MODES, default=ANALYSIS_MODE,
+                        help="compact ignores --templates and sends only the populated profile fields")
+    args = parser.parse_args()
+
+    from profile_store import get_profile, is_empty_profile, open_store, save_crawl
+
+    # Crawl and extract once (or reuse the stored profile), then fan out
+    store = open_store()
+    scraped_data, _ = get_profile(store, args.url)
+    if not scraped_data:
+        from scraper import scrape_business_info_with_sources
+        scraped_data, pages, sources = scrape_business_info_with_sources(args.url)
+        if not is_empty_profile(scraped_data):
+            save_crawl(store, args.url, scraped_data, pages, sources)
+
+    if args.mode == "compact":
+        results = fan_out({"compact": scraped_data}, args.models, build=build_compact_analysis_messages)
+    else:
+        prompts = render_templates(scraped_data, args.templates)
+        if not prompts:
+            return
+        results = fan_out(prompts, args.models)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"\n{'TEMPLATE':<30} {'MODEL':<15} {'LATENCY':>9} {'PROMPT':>8} {'OUTPUT':>8}")
+    print("-" * 74)
+    for r in results:
+        if r["error"]:
+            print(f"{r['template']:<30} {r['model']:<15} ❌ {r['error']}")
+            continue
+        print(f"{r['template']:<30} {r['model']:<15} {r['latency_seconds']:>8.1f}s "
+              f"{r['prompt_tokens']:>8} {r['completion_tokens']:>8}")
+        name = f"{os.path.splitext(os.path.basename(r['template']))[0]}__{r['model']}.txt"
+        with open(os.path.join(args.output_dir, name), 'w', encoding='utf-8') as f:
+            f.write(r["response"])
+    print(f"\n💾 Responses saved to: {args.output_dir}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import uuid
+
+from scraper import (
+    EXTRACTABLE_FIELDS, MAX_TEXT_CHARS, OPENAI_API_KEY, build_extraction_request,
+    crawl_pages, finalize_profile, parse_extraction_response,
+)
+from token_budget import EXTRACTION_COMPLETION_ESTIMATE, count_message_tokens, get_budget, project_batch_cost
+
+DEFAULT_BATCH_FILE = "extraction_batch.jsonl"
+CHAT_ENDPOINT = "/v1/chat/completions"
+STORE_CHUNK_SIZE = 500
+
+
+def manifest_path(batch_file):
+    return batch_file + ".manifest.json"
+
+
+def custom_id_for(url):
+    return "url-" + hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+
+class BatchBackend:
+    """Submits a JSONL file of chat requests and hands back the raw output lines
+
+    Output lines follow the OpenAI batch format:
+    {"custom_id": ..., "response": {"status_code": ..., "body": <chat completion>}, "error": ...}
+    """
+
+    def submit(self, batch_file):
+        """Return a batch id"""
+        raise NotImplementedError
+
+    def status(self, batch_id):
+        """Return one of validating, in_progress, completed, failed, expired, cancelled"""
+        raise NotImplementedError
+
+    def output_lines(self, batch_id):
+        raise NotImplementedError
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API: half-price requests completed within a 24h window"""
+
+    def __init__(self):
+        import openai
+        openai.api_key = OPENAI_API_KEY
+        self.client = openai
+
+    def submit(self, batch_file):
+        with open(batch_file, 'rb') as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=CHAT_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def status(self, batch_id):
+        return self.client.batches.retrieve(batch_id).status
+
+    def output_lines(self, batch_id):
+        # Requests that failed individually are written to the error file, not the output file
+        batch = self.client.batches.retrieve(batch_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines.extend(self.client.files.content(file_id).text.splitlines())
+        return lines
+
+
+class LocalBatchBackend(BatchBackend):
+    """Runs a batch file immediately through a local responder; for tests and dry runs
+
+    The responder receives the request body and returns the assistant message content.
+    The default returns an empty JSON object, which yields an all "Not available" profile.
+    """
+
+    def __init__(self, output_dir="local_batches", responder=None):
+        self.output_dir = output_dir
+        self.responder = responder or (lambda body: "{}")
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _output_file(self, batch_id):
+        return os.path.join(self.output_dir, f"{batch_id}.jsonl")
+
+    def submit(self, batch_file):
+        batch_id = "local-" + uuid.uuid4().hex[:12]
+        with open(batch_file, 'r', encoding='utf-8') as src, \
+                open(self._output_file(batch_id), 'w', encoding='utf-8') as out:
+            for line in src:
+                request = json.loads(line)
+                content = self.responder(request["body"])
+                prompt_tokens = count_message_tokens(request["body"]["messages"])
+                output = {
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "choices": [{"message": {"role": "assistant", "content": content}}],
+                            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 0,
+                                      "total_tokens": prompt_tokens},
+                        },
+                    },
+                    "error": None,
+                }
+                out.write(json.dumps(output, ensure_ascii=False) + "\n")
+        return batch_id
+
+    def status(self, batch_id):
+        return "completed" if os.path.exists(self._output_file(batch_id)) else "failed"
+
+    def output_lines(self, batch_id):
+        with open(self._output_file(batch_id), 'r', encoding='utf-8') as f:
+            for line in f:
+                yield line
+
+
+BACKENDS = {"openai": OpenAIBatchBackend, "local": LocalBatchBackend}
+
+
+def get_backend(name):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown batch backend: {name}")
+    return BACKENDS[name]()
+
+
+def prepare_batch(urls, batch_file=DEFAULT_BATCH_FILE, model="gpt-3.5-turbo", max_pages=8):
+    """Crawl each URL and write its extraction request to a JSONL batch file
+
+    A manifest next to the batch file maps each custom_id back to its URL and the fields
+    already read from site-builder structured data; only the rest are asked of the model.
+    """
+    # Refuse before hours of crawling when the batch can't fit the caps anyway
+    projection = project_batch_cost(len(urls), model, escalate=False)
+    print(f"💰 Projected usage: ~{projection['total_tokens']:,} tokens (~${projection['cost_usd']:.2f})")
+    get_budget().check(projection["total_tokens"])
+
+    manifest = {}
+    estimated_tokens = 0
+    with open(batch_file, 'w', encoding='utf-8') as f:
+        for url in urls:
+            pages = crawl_pages(url, max_pages)
+            text = '\n\n'.join(p["text"] for p in pages)[:MAX_TEXT_CHARS]
+            if not text.strip():
+                print(f"⏭️  {url}: no text collected, skipped")
+                continue
+            structured = {}
+            for page in pages:
+                for field, value in page["structured"].items():
+                    structured.setdefault(field, value)
+            fields = [k for k in EXTRACTABLE_FIELDS if k not in structured] if structured else None
+            messages = build_extraction_request(text, model, fields)
+            estimated_tokens += count_message_tokens(messages, model) + EXTRACTION_COMPLETION_ESTIMATE
+            custom_id = custom_id_for(url)
+            manifest[custom_id] = {"url": url, "structured": structured}
+            request = {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": CHAT_ENDPOINT,
+                "body": {"model": model, "messages": messages, "temperature": 0},
+            }
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+            print(f"📝 {url}")
+
+    with open(manifest_path(batch_file), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"📦 {len(manifest)} request(s) written to {batch_file} (~{estimated_tokens:,} tokens)")
+    return manifest
+
+
+def estimate_batch_tokens(batch_file):
+    """Prompt tokens of every request in a batch file plus the expected completions"""
+    total = 0
+    with open(batch_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                body = json.loads(line)["body"]
+                total += count_message_tokens(body["messages"], body["model"]) + EXTRACTION_COMPLETION_ESTIMATE
+    return total
+
+
+def submit_batch(backend, batch_file=DEFAULT_BATCH_FILE):
+    """Check the batch file against the token caps, then submit it; returns the batch id
+
+    This is the last point before the provider bills the batch, so the cap is enforced here.
+    """
+    get_budget().check(estimate_batch_tokens(batch_file))
+    return backend.submit(batch_file)
+
+
+def _manifest_entry(entry):
+    # Manifests written before structured fields were recorded map straight to the URL
+    if isinstance(entry, str):
+        return {"url": entry, "structured": {}}
+    return entry
+
+
+def iter_batch_results(batch_id, backend, batch_file=DEFAULT_BATCH_FILE):
+    """Map batch output back to URLs and build full profiles; yields (url, profile)"""
+    with open(manifest_path(batch_file), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    budget = get_budget()
+    seen = set()
+    for line in backend.output_lines(batch_id):
+        if not line.strip():
+            continue
+        output = json.loads(line)
+        entry = manifest.get(output["custom_id"])
+        if entry is None:
+            continue
+        seen.add(output["custom_id"])
+        entry = _manifest_entry(entry)
+        url = entry["url"]
+        result = dict(entry["structured"])
+        response = output.get("response") or {}
+        if output.get("error") or response.get("status_code") != 200:
+            print(f"❌ {url}: {output.get('error') or response.get('status_code')}")
+            yield url, finalize_profile(url, result or None)
+            continue
+        body = response["body"]
+        budget.record(body.get("usage", {}).get("total_tokens", 0))
+        ai_result = parse_extraction_response(body["choices"][0]["message"]["content"])
+        for field, value in (ai_result or {}).items():
+            result.setdefault(field, value)
+        yield url, finalize_profile(url, result or None)
+
+    # Requests missing from every output file (expired or cancelled batches)
+    for custom_id, entry in manifest.items():
+        if custom_id in seen:
+            continue
+        entry = _manifest_entry(entry)
+        print(f"❌ {entry['url']}: no result in batch output")
+        yield entry["url"], finalize_profile(entry["url"], dict(entry["structured"]) or None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline batch extraction")
+    parser.add_argument("--batch-file", default=DEFAULT_BATCH_FILE)
+    parser.add_argument("--backend", default="openai", choices=sorted(BACKENDS))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    prepare = sub.add_parser("prepare", help="Crawl URLs from a file and write the batch file")
+    prepare.add_argument("url_file")
+    prepare.add_argument("--model", default="gpt-3.5-turbo")
+    prepare.add_argument("--max-pages", type=int, default=8)
+
+    sub.add_parser("submit", help="Submit the batch file")
+
+    status = sub.add_parser("status", help="Show batch status")
+    status.add_argument("batch_id")
+
+    collect = sub.add_parser("collect", help="Fetch results and store profiles")
+    collect.add_argument("batch_id")
+    collect.add_argument("--wait", action="store_true", help="Poll until the batch finishes")
+    collect.add_argument("--parquet", help="Also write the collected profiles to this Parquet file")
+
+    args = parser.parse_args()
+
+    if args.command == "prepare":
+        from canonical_urls import collapse_sites
+        from profile_store import open_store
+
+        with open(args.url_file, 'r', encoding='utf-8') as f:
+            urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        sites, _ = collapse_sites(urls, open_store())
+        print(f"🔗 {len(urls)} input row(s) → {len(sites)} unique site(s)")
+        prepare_batch(sites, args.batch_file, args.model, args.max_pages)
+        return
+
+    backend = get_backend(args.backend)
+    if args.command == "submit":
+        batch_id = submit_batch(backend, args.batch_file)
+        print(f"🚀 Submitted batch {batch_id}")
+    elif args.command == "status":
+        print(f"📊 {args.batch_id}: {backend.status(args.batch_id)}")
+    else:
+        while args.wait and backend.status(args.batch_id) in ("validating", "in_progress", "finalizing"):
+            time.sleep(60)
+        from profile_store import open_store, upsert_profiles, is_empty_profile
+
+        # Store in chunks so memory stays flat however large the batch is
+        store = open_store()
+        parquet = None
+        if args.parquet:
+            from parquet_export import ProfileParquetWriter
+            parquet = ProfileParquetWriter(args.parquet)
+        collected = stored = 0
+        chunk = []
+        for url, profile in iter_batch_results(args.batch_id, backend, args.batch_file):
+            collected += 1
+            if parquet is not None:
+                parquet.write(url, profile)
+            if not is_empty_profile(profile):
+                chunk.append((url, profile))
+            if len(chunk) >= STORE_CHUNK_SIZE:
+                stored += upsert_profiles(store, chunk)
+                chunk = []
+        stored += upsert_profiles(store, chunk)
+        if parquet is not None:
+            parquet.close()
+        print(f"✅ Collected {collected} profile(s), stored {stored}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from urllib.parse import urlparse
+
+from frontier import HTTP_TIMEOUT, USER_AGENT
+from profile_store import canonical_domain, get_redirect, put_redirects
+
+RESOLVE_WORKERS = 32
+
+
+def normalize_url(raw):
+    """Normalize user input to scheme://host/path; None if it is not a usable website URL"""
+    url = raw.strip()
+    if not url:
+        return None
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    try:
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower().rstrip(".")
+        port = parsed.port
+    except ValueError:
+        # Bad port or bracketed host, e.g. "example.com:abc"
+        return None
+    if "." not in host:
+        return None
+    if port and not ((parsed.scheme == "http" and port == 80) or (parsed.scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    return f"{parsed.scheme.lower()}://{host}{parsed.path or '/'}"
+
+
+def site_root(url):
+    """The homepage URL of the site a URL belongs to"""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc.lower()}/"
+
+
+def resolve_site(url, session=None):
+    """Follow redirects from a site's homepage once over plain HTTP
+
+    Returns (site_root, resolved); resolved is False when the site could not be reached
+    and its own root is returned as-is.
+    """
+    import requests
+
+    session = session or requests.Session()
+    root = site_root(url)
+    headers = {"User-Agent": USER_AGENT}
+    try:
+        response = session.head(root, allow_redirects=True, timeout=HTTP_TIMEOUT, headers=headers)
+        if response.status_code in (403, 405, 501):
+            # Some servers refuse HEAD; a streamed GET stops after the headers
+            response = session.get(root, allow_redirects=True, timeout=HTTP_TIMEOUT, headers=headers, stream=True)
+            response.close()
+    except requests.RequestException:
+        return root, False
+    return site_root(response.url), True
+
+
+def collapse_sites(urls, conn=None, resolve=True):
+    """Collapse input URLs to unique sites before any browser work
+
+    Hosts are normalized (case, www., default ports, paths), then each distinct host is
+    resolved through its redirects once. Successful answers are cached in the profile
+    store for REDIRECT_TTL_DAYS when conn is given. Returns (sites, site_for) where sites
+    is the ordered list of unique site URLs to crawl and site_for maps every valid input
+    row to its site.
+    """
+    normalized = {}
+    for raw in urls:
+        url = normalize_url(raw)
+        if url:
+            normalized[raw] = url
+
+    # One representative URL per host key, resolved once
+    by_key = {}
+    for url in normalized.values():
+        by_key.setdefault(canonical_domain(url), url)
+
+    resolved = {}
+    pending = []
+    for key, url in by_key.items():
+        cached = get_redirect(conn, key) if conn is not None and resolve else None
+        if cached:
+            resolved[key] = cached
+        elif resolve:
+            pending.append(key)
+        else:
+            resolved[key] = site_root(url)
+
+    if pending:
+        from concurrent.futures import ThreadPoolExecutor
+
+        import requests
+
+        session = requests.Session()
+        with ThreadPoolExecutor(max_workers=RESOLVE_WORKERS) as pool:
+            answers = list(pool.map(lambda key: resolve_site(by_key[key], session), pending))
+        for key, (target, ok) in zip(pending, answers):
+            resolved[key] = target
+        # A transient failure is not an answer; only cache what actually resolved
+        if conn is not None:
+            put_redirects(conn, [(key, target) for key, (target, ok) in zip(pending, answers) if ok])
+
+    # Redirect aliases collapse onto the site they land on
+    sites = {}
+    site_for = {}
+    for raw, url in normalized.items():
+        target = resolved[canonical_domain(url)]
+        site = sites.setdefault(canonical_domain(target), target)
+        site_for[raw] = site
+    return list(sites.values()), site_for
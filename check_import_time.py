@@ -0,0 +1,91 @@
+"""Import-time budget check for the entry points
+
+Run `python check_import_time.py`. Pulling in a heavy dependency that should only load on
+first use always fails, and so does an entry point that cannot be imported at all, unless
+the missing module is one of its declared optional dependencies. Import time is noisy, so
+going over budget only warns; it fails once an entry point takes more than TIME_TOLERANCE
+times its budget.
+"""
+import re
+import subprocess
+import sys
+
+# Cumulative import time budget per entry point, in milliseconds
+IMPORT_BUDGETS_MS = {
+    "generate_prompt": 60,
+    "scraper": 40,
+    "profile_store": 40,
+    "worker": 50,
+    "batch_extract": 50,
+    "streamlit_app": 1500,  # dominated by streamlit itself
+}
+
+# Dependencies that must only be imported when they are actually used
+HEAVY_MODULES = {"playwright", "openai", "docx", "requests", "tiktoken", "pyarrow", "pandas", "numpy"}
+
+# Third-party packages an entry point may be checked without; a missing one skips it
+OPTIONAL_DEPENDENCIES = {"streamlit_app": {"streamlit"}}
+
+RUNS = 3
+
+# Timing is a loose budget: only this many times over it counts as a regression
+TIME_TOLERANCE = 2.0
+
+
+class ImportFailed(Exception):
+    def __init__(self, message, missing=None):
+        super().__init__(message)
+        self.missing = missing
+
+
+def measure(module):
+    """Return (cumulative_ms, top-level modules imported) for a fresh `import module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1]
+        missing = re.match(r"ModuleNotFoundError: No module named '([^'.]+)", error)
+        raise ImportFailed(error, missing.group(1) if missing else None)
+
+    cumulative_us = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, imported
+
+
+def main():
+    failures = 0
+    for module, budget_ms in IMPORT_BUDGETS_MS.items():
+        try:
+            runs = [measure(module) for _ in range(RUNS)]
+        except ImportFailed as e:
+            if e.missing in OPTIONAL_DEPENDENCIES.get(module, ()):
+                print(f"⏭️  {module}: skipped, optional dependency {e.missing} is not installed")
+            else:
+                print(f"❌ {module}: import failed ({e})")
+                failures += 1
+            continue
+
+        best_ms = min(ms for ms, _ in runs)
+        heavy = sorted(HEAVY_MODULES & runs[0][1])
+        ok = best_ms <= budget_ms * TIME_TOLERANCE and not heavy
+        status = "❌" if not ok else "⚠️ " if best_ms > budget_ms else "✅"
+        print(f"{status} {module}: {best_ms:.1f} ms (budget {budget_ms} ms, fails above {budget_ms * TIME_TOLERANCE:.0f} ms)")
+        if heavy:
+            print(f"   • eagerly imports: {', '.join(heavy)}")
+        failures += not ok
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
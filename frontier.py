@@ -0,0 +1,112 @@
+import gzip
+from collections import deque
+from urllib.parse import urljoin, urlparse
+
+USER_AGENT = "Mozilla/5.0 (compatible; GPTPromptGenerator/1.0)"
+HTTP_TIMEOUT = 5
+MAX_SITEMAPS = 10
+MAX_SITEMAP_URLS = 5000
+
+# Keywords that mark a page worth crawling, weighted by how much business info it usually holds
+LINK_KEYWORDS = {
+    "contact": 10, "pricing": 9, "price": 9, "rates": 8, "service": 8, "hours": 7,
+    "about": 6, "payment": 5, "team": 5, "staff": 5, "book": 4,
+    "policy": 3, "privacy": 3, "terms": 3, "info": 2, "footer": 1, "social": 1,
+}
+
+
+def _host(url):
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def link_score(url):
+    """Keyword weight of a URL path; 0 means not worth crawling"""
+    path = urlparse(url).path.lower()
+    return sum(weight for keyword, weight in LINK_KEYWORDS.items() if keyword in path)
+
+
+def load_robots(base_url, session=None):
+    """Fetch and parse robots.txt; unreachable files and any 4xx allow everything (RFC 9309)"""
+    import requests
+    from urllib.robotparser import RobotFileParser
+    session = session or requests.Session()
+    robots = RobotFileParser()
+    robots_url = urljoin(base_url, "/robots.txt")
+    robots.set_url(robots_url)
+    try:
+        response = session.get(robots_url, timeout=HTTP_TIMEOUT, headers={"User-Agent": USER_AGENT})
+    except requests.RequestException:
+        robots.allow_all = True
+        return robots
+    if response.status_code >= 400:
+        # 401/403 included: bot-protection fronts refuse plain clients, and the browser may still get in
+        robots.allow_all = True
+    else:
+        robots.parse(response.text.splitlines())
+    return robots
+
+
+def _parse_sitemap(content):
+    import xml.etree.ElementTree as ET
+    if content[:2] == b"\x1f\x8b":
+        content = gzip.decompress(content)
+    root = ET.fromstring(content)
+    locs = [el.text.strip() for el in root.iter() if el.tag.endswith("loc") and el.text]
+    return root.tag.endswith("sitemapindex"), locs
+
+
+def fetch_sitemap_urls(sitemap_urls, session=None):
+    """Collect page URLs from sitemaps, following sitemap indexes"""
+    import requests
+    import xml.etree.ElementTree as ET
+    session = session or requests.Session()
+    queue = deque(sitemap_urls)
+    seen = set()
+    pages = []
+    while queue and len(seen) < MAX_SITEMAPS and len(pages) < MAX_SITEMAP_URLS:
+        sitemap_url = queue.popleft()
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+        try:
+            response = session.get(sitemap_url, timeout=HTTP_TIMEOUT, headers={"User-Agent": USER_AGENT})
+            if response.status_code >= 400:
+                continue
+            is_index, locs = _parse_sitemap(response.content)
+        except (requests.RequestException, ET.ParseError, OSError):
+            continue
+        if is_index:
+            # Page sitemaps first; product/post sitemaps rarely hold contact or pricing pages
+            locs.sort(key=lambda loc: any(x in loc.lower() for x in ("product", "post", "blog")))
+            queue.extend(locs)
+        else:
+            pages.extend(locs)
+    return pages[:MAX_SITEMAP_URLS]
+
+
+def seed_frontier(url, max_urls=8):
+    """Pick the best contact/pricing/services URLs from robots.txt and sitemaps over plain HTTP
+
+    Returns (seed_urls, robots) so the crawler can also apply disallow rules to discovered links.
+    """
+    import requests
+    session = requests.Session()
+    robots = load_robots(url, session)
+    sitemaps = robots.site_maps() or [urljoin(url, "/sitemap.xml")]
+    candidates = fetch_sitemap_urls(sitemaps, session)
+
+    host = _host(url)
+    start = url.rstrip("/")
+    scored = {}
+    for candidate in candidates:
+        candidate = candidate.split("#")[0]
+        if _host(candidate) != host or candidate.rstrip("/") == start:
+            continue
+        if not robots.can_fetch(USER_AGENT, candidate):
+            continue
+        score = link_score(candidate)
+        if score > 0:
+            scored[candidate] = score
+    ranked = sorted(scored, key=lambda u: (-scored[u], len(u)))
+    return ranked[:max_urls], robots
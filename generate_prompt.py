@@ -2,8 +2,10 @@ import json
 import re
 import time
 import os
-import openai
-from scraper import scrape_business_info_with_ai
+from profile_store import open_store, get_profile, save_crawl, is_empty_profile
+from token_budget import count_message_tokens
+from analysis import analysis_messages, run_analysis
+from canonical_urls import normalize_url
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 def print_banner():
     """Print a beautiful banner"""
@@ -23,83 +25,63 @@ def print_progress(message, delay=0.5):
     time.sleep(delay)
     print(" ✅")
 
-def test_gpt_response(final_prompt, model="gpt-3.5-turbo"):
-    """Test GPT API with the generated prompt"""
+def test_gpt_response(final_prompt, model="gpt-3.5-turbo", scraped_data=None):
+    """Test GPT API with the generated prompt (or the compact profile, see ANALYSIS_MODE)"""
     print(f"\n🤖 TESTING GPT API RESPONSE")
     print("=" * 50)
     print(f"📡 Model: {model}")
-    print(f"📝 Prompt Length: {len(final_prompt)} characters")
     
     try:
-        # Configure OpenAI
-        openai.api_key = OPENAI_API_KEY
-        
-        # Create a test prompt
-        test_prompt = f"""
-Based on the following business information, provide a comprehensive analysis and suggestions:
-
-{final_prompt}
-
-Please provide:
-1. Business Overview (2-3 sentences)
-2. Key Strengths (3-4 points)
-3. Marketing Suggestions (3-4 ideas)
-4. Potential Improvements (2-3 suggestions)
-5. Target Audience Analysis (1-2 sentences)
-
-Format your response professionally with clear sections.
-"""
+        messages = analysis_messages(final_prompt, scraped_data)
+        print(f"📝 Prompt Length: {len(messages[-1]['content'])} characters "
+              f"(~{count_message_tokens(messages, model)} tokens)")
         
         print_progress("Sending request to GPT API")
         
-        # Make API call
-        response = openai.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a professional business analyst and marketing consultant. Provide clear, actionable insights based on business information."},
-                {"role": "user", "content": test_prompt}
-            ],
-            max_tokens=800,
-            temperature=0.7
-        )
-        
-        gpt_response = response.choices[0].message.content
-        
-        print_progress("Received response from GPT")
-        
-        # Display the response
-        print(f"\n🎯 GPT API RESPONSE:")
-        print("=" * 60)
-        print(gpt_response)
-        print("=" * 60)
-        
-        # Save GPT response
-        gpt_output_file = "gpt_response.txt"
-        with open(gpt_output_file, 'w', encoding='utf-8') as f:
-            f.write(f"Original Prompt:\n{final_prompt}\n\n")
-            f.write(f"GPT Response:\n{gpt_response}")
-        
-        print(f"\n💾 GPT response saved to: {gpt_output_file}")
-        
-        # Show response stats
-        response_tokens = response.usage.total_tokens
-        prompt_tokens = response.usage.prompt_tokens
-        completion_tokens = response.usage.completion_tokens
-        
-        print(f"\n📊 API USAGE STATS:")
-        print(f"   • Total Tokens: {response_tokens}")
-        print(f"   • Prompt Tokens: {prompt_tokens}")
-        print(f"   • Response Tokens: {completion_tokens}")
-        
-        return True, gpt_response
-        
+        # Budget preflight, the API call and usage bookkeeping all happen in run_analysis
+        result = run_analysis(messages, model)
     except Exception as e:
-        print(f"❌ GPT API Error: {e}")
+        result = {"error": str(e)}
+    
+    if result["error"]:
+        if result["error"].startswith("Token budget exceeded"):
+            print(f"🛑 {result['error']}")
+            return False, None
+        print(f"❌ GPT API Error: {result['error']}")
         print("💡 Possible issues:")
         print("   • API key might be invalid")
         print("   • Network connection issues")
         print("   • OpenAI service might be down")
         return False, None
+    
+    gpt_response = result["response"]
+    
+    print_progress("Received response from GPT")
+    
+    # Display the response
+    print(f"\n🎯 GPT API RESPONSE:")
+    print("=" * 60)
+    print(gpt_response)
+    print("=" * 60)
+    
+    # Save GPT response
+    gpt_output_file = "gpt_response.txt"
+    with open(gpt_output_file, 'w', encoding='utf-8') as f:
+        # The messages actually sent, which in compact mode are not final_prompt
+        f.write("Messages Sent:\n")
+        for message in messages:
+            f.write(f"[{message['role']}]\n{message['content']}\n\n")
+        f.write(f"GPT Response:\n{gpt_response}")
+    
+    print(f"\n💾 GPT response saved to: {gpt_output_file}")
+    
+    # Show response stats
+    print(f"\n📊 API USAGE STATS:")
+    print(f"   • Total Tokens: {result['total_tokens']}")
+    print(f"   • Prompt Tokens: {result['prompt_tokens']}")
+    print(f"   • Response Tokens: {result['completion_tokens']}")
+    
+    return True, gpt_response
 
 def load_template(template_file="prompt_template.txt"):
     """Load the prompt template from file"""
@@ -224,42 +206,56 @@ def print_data_summary(scraped_data):
     
     print("=" * 50)
 
-def generate_prompt_from_url(url, template_file="prompt_template.txt", output_file="final_prompt.txt"):
+def generate_prompt_from_url(url, template_file="prompt_template.txt", output_file="final_prompt.txt", use_store=True):
     """Main function to generate prompt from URL"""
     print(f"\n🎯 TARGET WEBSITE: {url}")
     print("=" * 60)
     
-    # Step 1: Scrape business data
-    print_progress("Initializing web scraper")
-    print_progress("Connecting to website")
+    # Step 1: Reuse a stored profile when this business is already known
+    store = open_store() if use_store else None
+    scraped_data = None
+    if store is not None:
+        scraped_data, meta = get_profile(store, url)
+        if scraped_data:
+            print(f"⚡ Using stored profile for {meta['domain']} (crawled {meta['crawled_at']})")
     
-    scraped_data = scrape_business_info_with_ai(url)
+    # Step 2: Scrape business data
     if not scraped_data:
-        print("❌ Failed to scrape data from the website")
-        print("💡 Possible reasons:")
-        print("   • Website might be blocking automated access")
-        print("   • URL might be incorrect")
-        print("   • Network connection issues")
-        return False
-    
-    print_progress("Extracting business information")
-    print_progress("Processing data with AI")
+        from scraper import scrape_business_info_with_sources
+        
+        print_progress("Initializing web scraper")
+        print_progress("Connecting to website")
+        
+        scraped_data, pages, sources = scrape_business_info_with_sources(url)
+        if not scraped_data:
+            print("❌ Failed to scrape data from the website")
+            print("💡 Possible reasons:")
+            print("   • Website might be blocking automated access")
+            print("   • URL might be incorrect")
+            print("   • Network connection issues")
+            return False
+        
+        print_progress("Extracting business information")
+        print_progress("Processing data with AI")
+        
+        if store is not None and not is_empty_profile(scraped_data):
+            save_crawl(store, url, scraped_data, pages, sources)
     
-    # Step 2: Load template
+    # Step 3: Load template
     print_progress("Loading prompt template")
     template = load_template(template_file)
     if not template:
         return False
     
-    # Step 3: Map data to template placeholders
+    # Step 4: Map data to template placeholders
     print_progress("Mapping data to template")
     data_mapping = map_scraped_data_to_template(scraped_data)
     
-    # Step 4: Replace placeholders
+    # Step 5: Replace placeholders
     print_progress("Replacing placeholders")
     final_prompt = replace_placeholders(template, data_mapping)
     
-    # Step 5: Save final prompt
+    # Step 6: Save final prompt
     print_progress("Saving final prompt")
     success = save_final_prompt(final_prompt, output_file)
     
@@ -292,13 +288,13 @@ def generate_prompt_from_url(url, template_file="prompt_template.txt", output_fi
         print("   ✅ Legal policies & certifications")
         print("   ✅ Brand messaging & tone")
         
-        # Step 6: Test GPT API Response
+        # Step 7: Test GPT API Response
         print(f"\n🤖 GPT API TESTING")
         print("=" * 40)
         test_choice = input("Would you like to test the prompt with GPT API? (y/n): ").strip().lower()
         
         if test_choice in ['y', 'yes', 'haan', 'h']:
-            test_success, gpt_response = test_gpt_response(final_prompt)
+            test_success, gpt_response = test_gpt_response(final_prompt, scraped_data=scraped_data)
             if test_success:
                 print(f"\n🎊 COMPLETE SUCCESS!")
                 print("=" * 40)
@@ -338,11 +334,9 @@ def get_user_input():
             print("❌ URL is required. Please enter a valid website URL.")
             continue
         
-        # Basic URL validation
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-        
-        if '.' in url and len(url) > 10:
+        # Normalize scheme/host and validate
+        url = normalize_url(url)
+        if url:
             return url
         else:
             print("❌ Please enter a valid website URL (e.g., https://example.com)")
@@ -0,0 +1,144 @@
+import os
+import re
+import sqlite3
+import threading
+
+from token_budget import USAGE_DB_PATH
+
+# Extraction models from cheapest to strongest; each tier only sees the fields the one before got wrong
+EXTRACTION_TIERS = [t.strip() for t in os.getenv("EXTRACTION_TIERS", "gpt-3.5-turbo,gpt-4-turbo").split(",") if t.strip()]
+
+# Fields worth a stronger model when they come back empty. Off by default: most small-business
+# sites simply lack pricing, hours or an email, and every escalation resends the full page text
+ESCALATE_MISSING_FIELDS = [f.strip() for f in os.getenv("ESCALATE_MISSING_FIELDS", "").split(",") if f.strip()]
+
+# Share of sites expected to need a second-tier call (malformed or ungrounded answers); used for projections
+EXPECTED_ESCALATION_SHARE = float(os.getenv("EXPECTED_ESCALATION_SHARE", "0.15"))
+
+# Offline stand-in models: name -> responder(messages) returning the assistant message content
+LOCAL_MODELS = {"local": lambda messages: "{}"}
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[a-z]{2,}$", re.IGNORECASE)
+SOCIAL_DOMAINS = {"facebook_url": "facebook.com", "instagram_url": "instagram.com", "linkedin_url": "linkedin.com"}
+
+
+def register_local_model(name, responder):
+    """Add an offline tier, e.g. a canned responder for tests or dry runs"""
+    LOCAL_MODELS[name] = responder
+
+
+def _digits(text):
+    return re.sub(r"\D", "", text)
+
+
+def field_problem(field, value, source_text):
+    """Why a tier's value should not be trusted: "missing", "malformed", "low_confidence" or None
+
+    Low confidence means a contact value the model could only have copied does not
+    appear anywhere in the crawled text.
+    """
+    if value is None or (isinstance(value, str) and value.strip() in ("", "Not available")):
+        return "missing"
+    value = str(value).strip()
+    if field == "email":
+        if not EMAIL_RE.match(value.replace("mailto:", "")):
+            return "malformed"
+        if value.replace("mailto:", "").lower() not in source_text.lower():
+            return "low_confidence"
+    elif field == "phone_number":
+        digits = _digits(value)
+        if not 7 <= len(digits) <= 15:
+            return "malformed"
+        if digits[-7:] not in _digits(source_text):
+            return "low_confidence"
+    elif field in SOCIAL_DOMAINS:
+        if SOCIAL_DOMAINS[field] not in value.lower():
+            return "malformed"
+        path = value.lower().split(SOCIAL_DOMAINS[field], 1)[1].strip("/")
+        if path and path not in source_text.lower():
+            return "low_confidence"
+    return None
+
+
+class TierStats:
+    """Per-tier counts of fields asked for and fields accepted, shared through the usage DB"""
+
+    def __init__(self, usage_db=USAGE_DB_PATH):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(usage_db, timeout=30, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS tier_stats (tier TEXT PRIMARY KEY, calls INTEGER NOT NULL, "
+                "fields_requested INTEGER NOT NULL, fields_accepted INTEGER NOT NULL)"
+            )
+
+    def record(self, tier, requested, accepted):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO tier_stats (tier, calls, fields_requested, fields_accepted) VALUES (?, 1, ?, ?) "
+                "ON CONFLICT(tier) DO UPDATE SET calls = calls + 1, "
+                "fields_requested = fields_requested + excluded.fields_requested, "
+                "fields_accepted = fields_accepted + excluded.fields_accepted",
+                (tier, requested, accepted),
+            )
+
+    def summary(self):
+        """One dict per tier with its hit rate (accepted / requested fields)"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT tier, calls, fields_requested, fields_accepted FROM tier_stats ORDER BY tier"
+            ).fetchall()
+        return [
+            {"tier": tier, "calls": calls, "fields_requested": requested, "fields_accepted": accepted,
+             "hit_rate": round(accepted / requested, 3) if requested else None}
+            for tier, calls, requested, accepted in rows
+        ]
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_tier_stats():
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = TierStats()
+    return _stats
+
+
+def route_extraction(pages, fields, extract, tiers=None):
+    """Run extract(pages, fields, model) tier by tier, escalating only the fields that failed
+
+    Returns (result, sources) in the shape extract returns. The last tier's well-formed
+    answers are kept even when they cannot be found verbatim in the text.
+    """
+    tiers = tiers or EXTRACTION_TIERS
+    source_text = "\n".join(p.get("text", "") for p in pages)
+    if not source_text.strip():
+        return None, {}
+    stats = get_tier_stats()
+    result = {}
+    sources = {}
+    pending = list(fields)
+    for i, tier in enumerate(tiers):
+        last = i == len(tiers) - 1
+        ai_result, ai_sources = extract(pages, pending, tier)
+        ai_result = ai_result or {}
+        retry = []
+        accepted = 0
+        for field in pending:
+            value = ai_result.get(field)
+            problem = field_problem(field, value, source_text)
+            if problem is None or (last and problem == "low_confidence"):
+                result[field] = value
+                if field in ai_sources:
+                    sources[field] = ai_sources[field]
+                accepted += 1
+            elif problem != "missing" or field in ESCALATE_MISSING_FIELDS:
+                retry.append(field)
+        stats.record(tier, len(pending), accepted)
+        pending = retry
+        if not pending:
+            break
+    return result or None, sources
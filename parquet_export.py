@@ -0,0 +1,153 @@
+import os
+from datetime import datetime, timezone
+
+from profile_store import canonical_domain
+from scraper import BUSINESS_FIELDS
+
+DEFAULT_ROW_GROUP_SIZE = 1000
+
+# Per-stage timings recorded by scrape_business_info_with_sources
+TIMING_COLUMNS = ["crawl_seconds", "extract_seconds", "total_seconds"]
+
+
+def profile_schema():
+    """Fixed Arrow schema for exported profiles
+
+    Every business field is dictionary-encoded: most hold "Not available" or one of a few
+    recurring values (payment methods, policies, hours), so each distinct string is
+    stored once per row group.
+    """
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("domain", pa.string()),
+            ("url", pa.string()),
+            ("extracted_at", pa.timestamp("s", tz="UTC")),
+        ]
+        + [(k, pa.dictionary(pa.int32(), pa.string())) for k in BUSINESS_FIELDS]
+        + [(k, pa.float64()) for k in TIMING_COLUMNS]
+    )
+
+
+class ProfileParquetWriter:
+    """Append profiles to a Parquet file, one row group per row_group_size profiles
+
+    The footer is only written on close, so rows go to a hidden temporary file that is
+    renamed to path at that point. A killed process leaves no half-written file for
+    dataset readers to trip over (they skip names starting with ".").
+    """
+
+    def __init__(self, path, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.row_group_size = row_group_size
+        self.schema = profile_schema()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.tmp_path = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+        self.writer = pq.ParquetWriter(self.tmp_path, self.schema, compression="zstd", use_dictionary=True)
+        self.row_groups = 0
+        self._reset()
+
+    def _reset(self):
+        self.columns = {name: [] for name in self.schema.names}
+        self.rows = 0
+
+    def write(self, url, profile, timings=None, extracted_at=None):
+        timings = timings or {}
+        self.columns["domain"].append(canonical_domain(url))
+        self.columns["url"].append(url)
+        self.columns["extracted_at"].append(extracted_at or datetime.now(timezone.utc))
+        for k in BUSINESS_FIELDS:
+            self.columns[k].append(profile.get(k, "Not available"))
+        for k in TIMING_COLUMNS:
+            self.columns[k].append(timings.get(k))
+        self.rows += 1
+        if self.rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        import pyarrow as pa
+
+        table = pa.Table.from_pydict(self.columns, schema=self.schema)
+        self.writer.write_table(table, row_group_size=self.row_group_size)
+        self.row_groups += 1
+        self._reset()
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RollingParquetWriter:
+    """Write profiles as numbered Parquet parts in a directory, starting a new part every
+    row_groups_per_file row groups
+
+    Meant for long-running writers such as workers: each part is published as soon as
+    it is full, so an unclean exit loses at most the rows of the part being written.
+    """
+
+    def __init__(self, directory, prefix, row_group_size=DEFAULT_ROW_GROUP_SIZE, row_groups_per_file=1):
+        self.directory = directory
+        self.prefix = prefix
+        self.row_group_size = row_group_size
+        self.row_groups_per_file = row_groups_per_file
+        self.parts = 0
+        self.current = None
+
+    def write(self, url, profile, timings=None, extracted_at=None):
+        if self.current is None:
+            path = os.path.join(self.directory, f"{self.prefix}-{self.parts:05d}.parquet")
+            self.current = ProfileParquetWriter(path, self.row_group_size)
+            self.parts += 1
+        self.current.write(url, profile, timings, extracted_at)
+        if self.current.row_groups >= self.row_groups_per_file:
+            self.close()
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _dataset(path):
+    import pyarrow.dataset as ds
+
+    return ds.dataset(path, format="parquet", schema=profile_schema())
+
+
+def read_profiles(path, columns=None, filter=None):
+    """Read a Parquet file or a directory of them into one Arrow table
+
+    Only the requested columns are read, and filter (a pyarrow.dataset expression)
+    is pushed down to skip row groups that cannot match.
+    """
+    return _dataset(path).to_table(columns=columns, filter=filter)
+
+
+def iter_profile_batches(path, columns=None, filter=None, batch_size=64 * 1024):
+    """Stream record batches for scans that should not hold everything in memory"""
+    return _dataset(path).to_batches(columns=columns, filter=filter, batch_size=batch_size)
+
+
+def read_profiles_dataframe(path, columns=None, filter=None):
+    """pandas DataFrame; dictionary columns come back as categoricals"""
+    return read_profiles(path, columns, filter).to_pandas()
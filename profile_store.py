@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+from scraper import BUSINESS_FIELDS, BusinessProfile
+
+DEFAULT_DB_PATH = os.getenv("PROFILE_DB_PATH", "profiles.db")
+# Sites change hosting and domains; cached redirects are re-checked after this long
+REDIRECT_TTL_DAYS = int(os.getenv("REDIRECT_TTL_DAYS", "30"))
+
+# Columns indexed by the full-text search table
+SEARCH_FIELDS = ["services_list", "service_descriptions", "service_areas"]
+
+
+def canonical_domain(url):
+    """Reduce a URL to the domain used as the profile key"""
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    host = (urlparse(url).hostname or "").lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+
+def content_hash(profile):
+    """Stable hash of the extracted field values"""
+    payload = json.dumps([str(profile.get(k, "Not available")) for k in BUSINESS_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_empty_profile(profile):
+    """True when nothing beyond the website URL was extracted"""
+    return all(
+        profile.get(k, "Not available") == "Not available"
+        for k in BUSINESS_FIELDS if k != "website_url"
+    )
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def open_store(db_path=DEFAULT_DB_PATH):
+    """Open (and create if needed) the SQLite profile store"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+    field_columns = ",\n            ".join(f"{k} TEXT NOT NULL DEFAULT 'Not available'" for k in BUSINESS_FIELDS)
+    search_columns = ", ".join(SEARCH_FIELDS)
+    new_search_values = ", ".join(f"new.{k}" for k in SEARCH_FIELDS)
+    old_search_values = ", ".join(f"old.{k}" for k in SEARCH_FIELDS)
+
+    with conn:
+        conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS profiles (
+            domain TEXT NOT NULL UNIQUE,
+            url TEXT NOT NULL,
+            {field_columns},
+            content_hash TEXT NOT NULL,
+            crawled_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_profiles_updated_at ON profiles(updated_at);
+        CREATE INDEX IF NOT EXISTS idx_profiles_crawled_at ON profiles(crawled_at);
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS profiles_fts USING fts5(
+            {search_columns}, content='profiles', content_rowid='rowid'
+        );
+        CREATE TRIGGER IF NOT EXISTS profiles_ai AFTER INSERT ON profiles BEGIN
+            INSERT INTO profiles_fts(rowid, {search_columns}) VALUES (new.rowid, {new_search_values});
+        END;
+        CREATE TRIGGER IF NOT EXISTS profiles_ad AFTER DELETE ON profiles BEGIN
+            INSERT INTO profiles_fts(profiles_fts, rowid, {search_columns}) VALUES ('delete', old.rowid, {old_search_values});
+        END;
+        CREATE TRIGGER IF NOT EXISTS profiles_au AFTER UPDATE ON profiles BEGIN
+            INSERT INTO profiles_fts(profiles_fts, rowid, {search_columns}) VALUES ('delete', old.rowid, {old_search_values});
+            INSERT INTO profiles_fts(rowid, {search_columns}) VALUES (new.rowid, {new_search_values});
+        END;
+
+        CREATE TABLE IF NOT EXISTS pages (
+            domain TEXT NOT NULL,
+            url TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            hash_kind TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at TEXT NOT NULL,
+            PRIMARY KEY (domain, url)
+        );
+        CREATE TABLE IF NOT EXISTS redirects (
+            source TEXT PRIMARY KEY,
+            target_url TEXT NOT NULL,
+            resolved_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS field_sources (
+            domain TEXT NOT NULL,
+            field TEXT NOT NULL,
+            page_url TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            PRIMARY KEY (domain, field)
+        );
+        """)
+        # Stores created before page hashes recorded how they were computed
+        if "hash_kind" not in {r["name"] for r in conn.execute("PRAGMA table_info(pages)")}:
+            conn.execute("ALTER TABLE pages ADD COLUMN hash_kind TEXT")
+    return conn
+
+
+def _upsert_sql():
+    columns = ["domain", "url"] + BUSINESS_FIELDS + ["content_hash", "crawled_at", "updated_at"]
+    placeholders = ", ".join("?" for _ in columns)
+    updates = ",\n        ".join(f"{k} = excluded.{k}" for k in ["url"] + BUSINESS_FIELDS + ["content_hash", "crawled_at"])
+    return f"""
+    INSERT INTO profiles ({", ".join(columns)}) VALUES ({placeholders})
+    ON CONFLICT(domain) DO UPDATE SET
+        {updates},
+        updated_at = CASE WHEN profiles.content_hash = excluded.content_hash
+                          THEN profiles.updated_at ELSE excluded.updated_at END
+    """
+
+
+def _profile_row(url, profile, crawled_at=None):
+    crawled_at = crawled_at or _now()
+    values = [str(profile.get(k, "Not available")) for k in BUSINESS_FIELDS]
+    return [canonical_domain(url), url] + values + [content_hash(profile), crawled_at, crawled_at]
+
+
+def upsert_profile(conn, url, profile, crawled_at=None):
+    """Insert or refresh a single profile"""
+    upsert_profiles(conn, [(url, profile)], crawled_at)
+
+
+def upsert_profiles(conn, items, crawled_at=None):
+    """Bulk insert or refresh (url, profile) pairs in a single transaction"""
+    rows = [_profile_row(url, profile, crawled_at) for url, profile in items]
+    with conn:
+        conn.executemany(_upsert_sql(), rows)
+    return len(rows)
+
+
+def _split_row(row):
+    profile = BusinessProfile.from_dict({k: row[k] for k in BUSINESS_FIELDS})
+    meta = {k: row[k] for k in ("domain", "url", "content_hash", "crawled_at", "updated_at")}
+    return profile, meta
+
+
+def get_redirect(conn, domain, ttl_days=REDIRECT_TTL_DAYS):
+    """Cached site URL a domain redirects to, or None when unknown or older than ttl_days"""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=ttl_days)).isoformat(timespec="seconds")
+    row = conn.execute(
+        "SELECT target_url FROM redirects WHERE source = ? AND resolved_at >= ?", (domain, cutoff)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def put_redirects(conn, items):
+    """Cache (domain, target site URL) pairs"""
+    resolved_at = _now()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO redirects (source, target_url, resolved_at) VALUES (?, ?, ?)",
+            [(domain, target, resolved_at) for domain, target in items],
+        )
+
+
+def get_profile(conn, url):
+    """Look up a stored profile by URL; returns (profile, meta) or (None, None)
+
+    Domains known to redirect elsewhere resolve to the profile of the site they land on.
+    """
+    domain = canonical_domain(url)
+    target = get_redirect(conn, domain)
+    if target:
+        domain = canonical_domain(target)
+    row = conn.execute("SELECT * FROM profiles WHERE domain = ?", (domain,)).fetchone()
+    if row is None:
+        return None, None
+    return _split_row(row)
+
+
+def search_profiles(conn, query, limit=20):
+    """Full-text search over services and service areas"""
+    terms = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+    if not terms:
+        return []
+    rows = conn.execute(
+        """
+        SELECT p.* FROM profiles_fts
+        JOIN profiles p ON p.rowid = profiles_fts.rowid
+        WHERE profiles_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+        """,
+        (terms, limit),
+    ).fetchall()
+    return [_split_row(row) for row in rows]
+
+
+def recently_updated(conn, since, limit=100):
+    """Profiles whose content changed at or after an ISO timestamp"""
+    rows = conn.execute(
+        "SELECT * FROM profiles WHERE updated_at >= ? ORDER BY updated_at DESC LIMIT ?",
+        (since, limit),
+    ).fetchall()
+    return [_split_row(row) for row in rows]
+
+
+def save_provenance(conn, url, pages, sources, replace=True):
+    """Store crawled page hashes and the page each field was taken from
+
+    With replace=False only the given pages and fields are updated (incremental refresh).
+    """
+    domain = canonical_domain(url)
+    fetched_at = _now()
+    with conn:
+        if replace:
+            conn.execute("DELETE FROM pages WHERE domain = ?", (domain,))
+            conn.execute("DELETE FROM field_sources WHERE domain = ?", (domain,))
+        conn.executemany(
+            "INSERT OR REPLACE INTO pages (domain, url, content_hash, hash_kind, etag, last_modified, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(domain, p["url"], p["hash"], p.get("hash_kind"), p.get("etag"), p.get("last_modified"), fetched_at)
+             for p in pages],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO field_sources (domain, field, page_url, content_hash) VALUES (?, ?, ?, ?)",
+            [(domain, field, src["page_url"], src["content_hash"]) for field, src in sources.items()],
+        )
+
+
+def save_crawl(conn, url, profile, pages, sources):
+    """Store a freshly crawled profile together with its provenance"""
+    upsert_profile(conn, url, profile)
+    save_provenance(conn, url, pages, sources)
+
+
+def get_pages(conn, url):
+    rows = conn.execute(
+        "SELECT url, content_hash, hash_kind, etag, last_modified FROM pages WHERE domain = ?",
+        (canonical_domain(url),),
+    ).fetchall()
+    return [{"url": r["url"], "hash": r["content_hash"], "hash_kind": r["hash_kind"], "etag": r["etag"],
+             "last_modified": r["last_modified"]}
+            for r in rows]
+
+
+def get_field_sources(conn, url):
+    rows = conn.execute(
+        "SELECT field, page_url, content_hash FROM field_sources WHERE domain = ?",
+        (canonical_domain(url),),
+    ).fetchall()
+    return {r["field"]: {"page_url": r["page_url"], "content_hash": r["content_hash"]} for r in rows}
+
+
+def delete_field_sources(conn, url, fields):
+    with conn:
+        conn.executemany(
+            "DELETE FROM field_sources WHERE domain = ? AND field = ?",
+            [(canonical_domain(url), field) for field in fields],
+        )
@@ -0,0 +1,114 @@
+import argparse
+
+from frontier import HTTP_TIMEOUT, USER_AGENT
+from profile_store import (
+    delete_field_sources, get_field_sources, get_pages, get_profile,
+    open_store, save_crawl, save_provenance, upsert_profile,
+)
+from scraper import (
+    BUSINESS_FIELDS, HASH_KIND_HTML_TEXT, BusinessProfile, clean_text, extract_fields,
+    html_text_hash, render_pages, scrape_business_info_with_sources,
+)
+
+
+def check_page(session, page):
+    """Cheap plain-HTTP check of a stored page; returns the new hash, or None if unchanged"""
+    import requests
+
+    headers = {"User-Agent": USER_AGENT}
+    if page.get("etag"):
+        headers["If-None-Match"] = page["etag"]
+    if page.get("last_modified"):
+        headers["If-Modified-Since"] = page["last_modified"]
+    try:
+        response = session.get(page["url"], timeout=HTTP_TIMEOUT, headers=headers)
+    except requests.RequestException:
+        # Unreachable right now; keep what we have rather than wiping its fields
+        return None
+    if response.status_code == 304 or response.status_code >= 400:
+        return None
+    new_hash = html_text_hash(response.content)
+    # Hashes of another kind (rendered text, or raw bodies from older stores) can't be compared
+    if page.get("hash_kind") == HASH_KIND_HTML_TEXT and new_hash == page["hash"]:
+        return None
+    return new_hash
+
+
+def refresh_profile(conn, url, max_pages=8, session=None):
+    """Re-extract only the fields whose source pages changed since the last crawl
+
+    Returns (profile, changed_page_urls). Unknown sites get a full crawl.
+    """
+    stored, _ = get_profile(conn, url)
+    stored_pages = get_pages(conn, url)
+    if stored is None or not stored_pages:
+        profile, pages, sources = scrape_business_info_with_sources(url, max_pages)
+        save_crawl(conn, url, profile, pages, sources)
+        return profile, [p["url"] for p in pages]
+
+    if session is None:
+        import requests
+        session = requests.Session()
+    changed = []
+    for page in stored_pages:
+        new_hash = check_page(session, page)
+        if new_hash:
+            changed.append(dict(page, hash=new_hash, hash_kind=HASH_KIND_HTML_TEXT))
+    if not changed:
+        return stored, []
+
+    changed_urls = {p["url"] for p in changed}
+    sources = get_field_sources(conn, url)
+    # Fields taken from a changed page, plus anything still missing that the new text might hold
+    fields = [
+        f for f in BUSINESS_FIELDS
+        if f != "website_url" and (sources.get(f, {}).get("page_url") in changed_urls or stored[f] == "Not available")
+    ]
+    if not fields:
+        save_provenance(conn, url, changed, {}, replace=False)
+        return stored, sorted(changed_urls)
+
+    fresh_pages = render_pages([p["url"] for p in changed])
+    ai_result, new_sources = extract_fields(fresh_pages, fields)
+    ai_result = ai_result or {}
+    # Changed pages that failed to render (timeout, open breaker, text budget) keep their
+    # fields and their old hash, so the next refresh tries them again
+    fetched_urls = {p["url"] for p in fresh_pages}
+
+    profile = stored.to_dict()
+    dropped = []
+    for field in fields:
+        value = ai_result.get(field)
+        if value and value != "Not available":
+            profile[field] = clean_text(value)
+        elif sources.get(field, {}).get("page_url") in fetched_urls:
+            # The page this value came from was re-read and no longer has it
+            profile[field] = "Not available"
+            dropped.append(field)
+
+    for page in fresh_pages:
+        page.pop("text", None)
+        page.pop("structured", None)
+    upsert_profile(conn, url, profile)
+    save_provenance(conn, url, fresh_pages, new_sources, replace=False)
+    delete_field_sources(conn, url, [f for f in dropped if f not in new_sources])
+    return BusinessProfile.from_dict(profile), sorted(changed_urls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally refresh stored profiles")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--max-pages", type=int, default=8)
+    args = parser.parse_args()
+
+    conn = open_store()
+    for url in args.urls:
+        _, changed = refresh_profile(conn, url, args.max_pages)
+        if changed:
+            print(f"🔄 {url}: {len(changed)} page(s) changed")
+        else:
+            print(f"✅ {url}: unchanged")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,129 +1,459 @@
-from playwright.sync_api import sync_playwright
 from urllib.parse import urljoin, urlparse
 from collections import deque
-import openai
+import hashlib
 import os
+import re
+import sys
+import time
+from frontier import USER_AGENT, _host, link_score, seed_frontier
+from model_router import LOCAL_MODELS, route_extraction
+from site_builders import PLATFORM_MAX_PAGES, fingerprint, live_routes, structured_fields
+from site_health import check_site, get_breaker
+from token_budget import (
+    EXTRACTION_COMPLETION_ESTIMATE, EXTRACTION_PROMPT_TOKEN_LIMIT,
+    count_message_tokens, get_budget, trim_to_tokens,
+)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Characters of crawled text kept for extraction
+MAX_TEXT_CHARS = 8000
+
+BUSINESS_FIELDS = [
+    "company_name", "address", "phone_number", "email", "website_url", "business_hours", "timezone",
+    "services_list", "service_descriptions", "pricing", "duration", "booking_links", "service_areas",
+    "payment_methods", "financing_plans", "refund_policy",
+    "staff_names", "staff_titles", "staff_bios", "staff_photos",
+    "facebook_url", "instagram_url", "linkedin_url", "social_handles", "promotions", "testimonials",
+    "privacy_policy", "terms_of_service", "licenses_certifications",
+    "tagline", "mission_statement", "communication_style"
+]
+
+# One shared string object for the placeholder most fields end up holding
+NOT_AVAILABLE = sys.intern("Not available")
+
+_FIELD_SET = frozenset(BUSINESS_FIELDS)
+
+class BusinessProfile:
+    # Compact profile record: __slots__ instead of a per-instance dict, and the
+    # "Not available" sentinel shared across every record. Dict-style reads keep it
+    # usable wherever the old 32-key dicts were.
+    __slots__ = tuple(BUSINESS_FIELDS)
+    
+    def __init__(self, **values):
+        unknown = set(values) - _FIELD_SET
+        if unknown:
+            raise TypeError(f"Unknown profile fields: {', '.join(sorted(unknown))}")
+        for k in BUSINESS_FIELDS:
+            setattr(self, k, values.get(k, NOT_AVAILABLE))
+    
+    def __getitem__(self, key):
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key):
+        return key in _FIELD_SET
+    
+    def __eq__(self, other):
+        if not isinstance(other, BusinessProfile):
+            return NotImplemented
+        return self.items() == other.items()
+    
+    def __repr__(self):
+        filled = ", ".join(f"{k}={v!r}" for k, v in self.items() if v is not NOT_AVAILABLE)
+        return f"BusinessProfile({filled})"
+    
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _FIELD_SET else default
+    
+    def keys(self):
+        return list(BUSINESS_FIELDS)
+    
+    def items(self):
+        return [(k, getattr(self, k)) for k in BUSINESS_FIELDS]
+    
+    def to_dict(self):
+        return dict(self.items())
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{k: _compact(data.get(k)) for k in BUSINESS_FIELDS})
+
+def _compact(value):
+    if not value or value == NOT_AVAILABLE:
+        return NOT_AVAILABLE
+    return str(value)
+
 def clean_text(text):
     if not text:
-        return "Not available"
+        return NOT_AVAILABLE
     if isinstance(text, dict):
         return str(text)
     if not isinstance(text, str):
         return str(text)
-    return " ".join(text.split())
+    return _compact(" ".join(text.split()))
 
-def extract_links(page, base_url):
-    anchors = page.query_selector_all('a[href]')
+# One in-page pass over the DOM: readable blocks (headings, paragraphs, list items, table
+# rows) with hidden, navigation and cookie/consent regions left out, plus every link href
+PAGE_CONTENT_SCRIPT = r"""
+() => {
+    const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'SVG', 'IFRAME', 'CANVAS',
+                          'NAV', 'BUTTON', 'SELECT', 'OPTION', 'DIALOG']);
+    const BLOCK = new Set(['P', 'DIV', 'SECTION', 'ARTICLE', 'MAIN', 'ASIDE', 'HEADER', 'FOOTER',
+                           'ADDRESS', 'BLOCKQUOTE', 'PRE', 'FORM', 'FIELDSET', 'DL', 'DT', 'DD',
+                           'UL', 'OL', 'FIGURE', 'FIGCAPTION', 'BR', 'HR', 'TABLE', 'THEAD',
+                           'TBODY', 'TFOOT', 'CAPTION']);
+    const BOILERPLATE = /cookie|consent|gdpr|onetrust|cookiebot|cc-window|skip-link/i;
+    const blocks = [];
+    let buffer = [];
+
+    const flush = (prefix = '') => {
+        const text = buffer.join(' ').replace(/\s+/g, ' ').trim();
+        buffer = [];
+        if (text) blocks.push(prefix + text);
+    };
+    const isHidden = (el) => {
+        if (el.hidden || el.getAttribute('aria-hidden') === 'true') return true;
+        const style = getComputedStyle(el);
+        return style.display === 'none' || style.visibility === 'hidden';
+    };
+    const isBoilerplate = (el) => {
+        if (el.getAttribute('role') === 'navigation' || el.getAttribute('aria-modal') === 'true') return true;
+        const cls = typeof el.className === 'string' ? el.className : '';
+        return BOILERPLATE.test(`${el.id} ${cls} ${el.getAttribute('aria-label') || ''}`);
+    };
+    const linkTarget = (a) => {
+        // Keep targets the model needs: contact, booking and social links
+        const href = a.href || '';
+        if (href.startsWith('mailto:') || href.startsWith('tel:')) return href;
+        try {
+            return new URL(href).host !== location.host && href.startsWith('http') ? href : null;
+        } catch (e) {
+            return null;
+        }
+    };
+
+    const walk = (node) => {
+        for (const child of node.childNodes) {
+            if (child.nodeType === Node.TEXT_NODE) {
+                buffer.push(child.nodeValue);
+                continue;
+            }
+            if (child.nodeType !== Node.ELEMENT_NODE) continue;
+            const tag = child.tagName.toUpperCase();
+            if (SKIP.has(tag) || isHidden(child) || isBoilerplate(child)) continue;
+            if (/^H[1-6]$/.test(tag)) {
+                flush();
+                walk(child);
+                flush('#'.repeat(Number(tag[1])) + ' ');
+            } else if (tag === 'LI') {
+                flush();
+                walk(child);
+                flush('- ');
+            } else if (tag === 'TR') {
+                flush();
+                const cells = Array.from(child.cells, (c) => c.textContent.replace(/\s+/g, ' ').trim());
+                if (cells.some(Boolean)) blocks.push(cells.join(' | '));
+            } else if (tag === 'A') {
+                walk(child);
+                const target = linkTarget(child);
+                if (target) buffer.push(`(${target})`);
+            } else if (BLOCK.has(tag)) {
+                flush();
+                walk(child);
+                flush();
+            } else {
+                walk(child);
+            }
+        }
+    };
+
+    walk(document.body);
+    flush();
+    const generator = document.querySelector('meta[name="generator"]');
+    const sqsp = window.Static && window.Static.SQUARESPACE_CONTEXT && window.Static.SQUARESPACE_CONTEXT.website;
+    return {
+        blocks,
+        links: Array.from(document.querySelectorAll('a[href]'), (a) => a.href),
+        // Site-builder fingerprint and embedded business data
+        generator: generator ? generator.content : '',
+        assets: Array.from(document.querySelectorAll('script[src], link[href]'), (el) => el.src || el.href).slice(0, 50),
+        jsonld: Array.from(document.querySelectorAll('script[type="application/ld+json"]'), (el) => el.textContent),
+        squarespace: sqsp ? {
+            siteTitle: sqsp.siteTitle, timeZone: sqsp.timeZone, location: sqsp.location,
+            socialAccounts: sqsp.socialAccounts, businessHours: sqsp.businessHours,
+        } : null,
+    };
+}
+"""
+
+def extract_links(hrefs, base_url):
     links = set()
-    for a in anchors:
-        href = a.get_attribute('href')
+    for href in hrefs:
         if href and not href.startswith('mailto:') and not href.startswith('tel:'):
             full_url = urljoin(base_url, href)
             if urlparse(full_url).netloc == urlparse(base_url).netloc:
                 links.add(full_url.split('#')[0])
     return links
 
-def scrape_and_collect_text(url, max_pages=8):
+# Page hashes are computed from the served HTML's visible text so a plain HTTP fetch can
+# reproduce them; scripts, tags and attributes (nonces, CSRF tokens, asset versions) are left out
+HASH_KIND_HTML_TEXT = "html-text"
+HASH_KIND_RENDERED = "rendered-text"
+_HTML_NOISE = re.compile(r'<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+_HTML_TAG = re.compile(r'<[^>]*>')
+
+def html_text_hash(body):
+    import html
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', errors='replace')
+    text = html.unescape(_HTML_TAG.sub(' ', _HTML_NOISE.sub(' ', body)))
+    return hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()
+
+def fetch_page(page, url):
+    try:
+        response = page.goto(url, timeout=30000)
+        page.wait_for_load_state('networkidle', timeout=20000)
+        # Text blocks and link targets in a single round trip
+        content = page.evaluate(PAGE_CONTENT_SCRIPT)
+    except Exception:
+        return None
+    
+    text = '\n'.join(content["blocks"])
+    headers = response.headers if response else {}
+    platform = fingerprint(headers, content)
+    try:
+        structured = structured_fields(platform, content, content["links"])
+    except Exception:
+        # Odd embedded data must never cost us the page itself
+        structured = {}
+    
+    # Hash the document as served so a later plain HTTP fetch can tell whether it changed;
+    # without a body only the rendered text is left, which refresh cannot compare against
+    try:
+        page_hash, hash_kind = html_text_hash(response.body()), HASH_KIND_HTML_TEXT
+    except Exception:
+        page_hash, hash_kind = hashlib.sha256(text.encode('utf-8')).hexdigest(), HASH_KIND_RENDERED
+    return {
+        "url": url,
+        "text": text,
+        "links": content["links"],
+        "platform": platform,
+        "structured": structured,
+        "hash": page_hash,
+        "hash_kind": hash_kind,
+        "etag": headers.get('etag'),
+        "last_modified": headers.get('last-modified'),
+    }
+
+def drop_repeated_blocks(record, seen):
+    # Header/footer blocks repeat on every page of a site; keep only their first occurrence
+    kept = []
+    for block in record["text"].split('\n'):
+        if block not in seen:
+            seen.add(block)
+            kept.append(block)
+    record["text"] = '\n'.join(kept)
+    return record
+
+def iter_pages(url, max_pages=8):
+    # Dead or blocked sites are skipped before any sitemap fetch or browser launch
+    reason = check_site(url)
+    if reason:
+        print(f"⛔ {url}: {reason}, skipped")
+        return
+    
+    # Seed the frontier from robots.txt/sitemaps over plain HTTP; only fall back to
+    # discovering links from rendered pages when the sitemap did not cover enough pages
+    seeds, robots = seed_frontier(url, max_pages - 1)
+    breaker = get_breaker()
+    domain = _host(url)
+    discover_links = len(seeds) < max_pages - 1
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            page = browser.new_page()
+            visited = set()
+            seen_blocks = set()
+            queue = deque([url] + seeds)
+            pages_crawled = 0
+            while queue and pages_crawled < max_pages:
+                current_url = queue.popleft()
+                if current_url in visited or not robots.can_fetch(USER_AGENT, current_url):
+                    continue
+                record = fetch_page(page, current_url)
+                if record is None:
+                    if breaker.record_failure(domain):
+                        print(f"⛔ {url}: {breaker.blocked(domain)}, crawl stopped")
+                        break
+                    continue
+                breaker.record_success(domain)
+                visited.add(current_url)
+                pages_crawled += 1
+                
+                hrefs = record.pop("links")
+                if pages_crawled == 1 and record["platform"]:
+                    # Known builder: go straight to its contact/services routes instead of
+                    # working through the sitemap or discovered links
+                    routes = [r for r in live_routes(url, record["platform"])
+                              if r not in visited and robots.can_fetch(USER_AGENT, r)]
+                    if routes:
+                        print(f"🧩 {url}: {record['platform']} site, {len(routes)} known page(s)")
+                        queue = deque(routes + [u for u in queue if u not in routes])
+                        discover_links = False
+                        max_pages = min(max_pages, PLATFORM_MAX_PAGES)
+                if discover_links:
+                    links = extract_links(hrefs, url)
+                    for link in links:
+                        if link not in visited and link not in queue and link_score(link) > 0:
+                            queue.append(link)
+                yield drop_repeated_blocks(record, seen_blocks)
+        finally:
+            browser.close()
+
+def crawl_pages(url, max_pages=8, max_chars=MAX_TEXT_CHARS):
+    # Consume the page stream keeping at most max_chars of text in total; once the
+    # budget is spent the crawl stops, since further text would be cut anyway
+    pages = []
+    remaining = max_chars
+    stream = iter_pages(url, max_pages)
+    try:
+        for record in stream:
+            record["text"] = record["text"][:remaining]
+            remaining -= len(record["text"])
+            pages.append(record)
+            if remaining <= 0:
+                break
+    finally:
+        stream.close()
+    return pages
+
+def render_pages(urls, max_chars=MAX_TEXT_CHARS):
+    # Re-render a known set of pages without any link discovery
+    from playwright.sync_api import sync_playwright
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         page = browser.new_page()
-        visited = set()
-        queue = deque([url])
-        all_text = []
-        pages_crawled = 0
-        while queue and pages_crawled < max_pages:
-            current_url = queue.popleft()
-            if current_url in visited:
+        pages = []
+        seen_blocks = set()
+        remaining = max_chars
+        breaker = get_breaker()
+        for u in urls:
+            if breaker.blocked(_host(u)):
                 continue
-            try:
-                page.goto(current_url, timeout=30000)
-                page.wait_for_load_state('networkidle', timeout=20000)
-            except Exception:
+            record = fetch_page(page, u)
+            if record is None:
+                breaker.record_failure(_host(u))
                 continue
-            visited.add(current_url)
-            pages_crawled += 1
-            
-            # More comprehensive text extraction
-            page_text = page.inner_text('body')
-            all_text.append(page_text)
-            
-            links = extract_links(page, url)
-            for link in links:
-                if link not in visited and any(x in link.lower() for x in ["contact", "about", "footer", "info", "service", "hours", "payment", "team", "staff", "social", "policy", "privacy", "terms"]):
-                    queue.append(link)
+            breaker.record_success(_host(u))
+            record.pop("links")
+            drop_repeated_blocks(record, seen_blocks)
+            record["text"] = record["text"][:remaining]
+            remaining -= len(record["text"])
+            pages.append(record)
+            if remaining <= 0:
+                break
         browser.close()
-        combined = '\n\n'.join(all_text)
-        return combined[:8000]  # Increased limit
+        return pages
+
+def scrape_and_collect_text(url, max_pages=8):
+    combined = '\n\n'.join(p["text"] for p in crawl_pages(url, max_pages))
+    return combined[:MAX_TEXT_CHARS]
 
-def extract_with_llm(text):
+def format_pages(pages):
+    # Number each page so the model can say which page a field came from
+    combined = '\n\n'.join(f"[Page {i}] {p['url']}\n{p['text']}" for i, p in enumerate(pages, 1))
+    return combined[:MAX_TEXT_CHARS]
+
+# Fields the model is asked for, grouped the way the prompt presents them
+EXTRACTION_SECTIONS = [
+    ("Basic Info", [
+        ("company_name", "Business/company name"),
+        ("address", "Street address, city, state, ZIP"),
+        ("phone_number", "Phone number"),
+        ("email", "Email address (look for contact forms, email links, mailto: links, contact information)"),
+        ("business_hours", 'Operating hours (look for "hours", "open", "closed", days of week, time schedules)'),
+        ("website_url", "Website URL"),
+    ]),
+    ("Services", [
+        ("services_list", "List of services offered (as comma-separated string)"),
+        ("service_descriptions", "Descriptions of services"),
+        ("pricing", "Pricing information (look for dollar amounts, costs, fees, packages)"),
+        ("duration", "Service duration (look for hours, days, weeks, course lengths)"),
+        ("booking_links", 'Online booking links (look for "book online", "schedule", "appointment", "reserve", booking forms)'),
+        ("service_areas", 'Service areas/cities (look for "serving", "areas", "locations", "cities", "regions")'),
+    ]),
+    ("Payments & Policies", [
+        ("payment_methods", "Accepted payment methods (look for PacePay, credit cards, cash, financing options)"),
+        ("financing_plans", "Financing options (look for payment plans, tuition assistance, lenders)"),
+        ("refund_policy", "Refund/cancellation policy"),
+    ]),
+    ("Team", [
+        ("staff_names", "Staff member names"),
+        ("staff_titles", "Job titles/roles"),
+    ]),
+    ("Social Media", [
+        ("facebook_url", "Facebook URL (look for facebook.com links, Facebook icons, social media links)"),
+        ("instagram_url", "Instagram URL (look for instagram.com links, Instagram icons, social media links)"),
+        ("linkedin_url", "LinkedIn URL (look for linkedin.com links, LinkedIn icons, social media links)"),
+    ]),
+    ("Policies", [
+        ("privacy_policy", 'Privacy policy (look for "privacy policy", "privacy", "data protection")'),
+        ("terms_of_service", 'Terms of service (look for "terms", "terms of service", "terms of use")'),
+        ("licenses_certifications", "Licenses/certifications"),
+    ]),
+    ("Branding", [
+        ("tagline", "Company tagline/slogan (look for slogans, catchphrases, company mottos, short memorable phrases)"),
+        ("mission_statement", "Mission statement"),
+    ]),
+]
+
+EXTRACTABLE_FIELDS = [key for _, section_fields in EXTRACTION_SECTIONS for key, _ in section_fields]
+
+def build_extraction_messages(text, fields=None, with_sources=False):
+    sections = []
+    for section, section_fields in EXTRACTION_SECTIONS:
+        lines = [f"- {key}: {description}" for key, description in section_fields if fields is None or key in fields]
+        if lines:
+            sections.append(f"{section}:\n" + "\n".join(lines))
+    field_list = "\n\n".join(sections)
+    sources_note = ""
+    if with_sources:
+        sources_note = '\nAlso include a "_sources" object mapping each field you found to the [Page N] number it came from.\n'
+    
     prompt = f"""
 Extract the following comprehensive business information from the text below. If a field is not found, return 'Not available'. 
 IMPORTANT: Be very thorough in extracting pricing information, service durations, and all business details. Look for dollar amounts ($), pricing packages, course durations, and service costs.
 Output as JSON with these keys:
 
-Basic Info:
-- company_name: Business/company name
-- address: Street address, city, state, ZIP
-- phone_number: Phone number
-- email: Email address (look for contact forms, email links, mailto: links, contact information)
-- business_hours: Operating hours (look for "hours", "open", "closed", days of week, time schedules)
-- website_url: Website URL
-
-Services:
-- services_list: List of services offered (as comma-separated string)
-- service_descriptions: Descriptions of services
-- pricing: Pricing information (look for dollar amounts, costs, fees, packages)
-- duration: Service duration (look for hours, days, weeks, course lengths)
-- booking_links: Online booking links (look for "book online", "schedule", "appointment", "reserve", booking forms)
-- service_areas: Service areas/cities (look for "serving", "areas", "locations", "cities", "regions")
-
-Payments & Policies:
-- payment_methods: Accepted payment methods (look for PacePay, credit cards, cash, financing options)
-- financing_plans: Financing options (look for payment plans, tuition assistance, lenders)
-- refund_policy: Refund/cancellation policy
-
-Team:
-- staff_names: Staff member names
-- staff_titles: Job titles/roles
-
-Social Media:
-- facebook_url: Facebook URL (look for facebook.com links, Facebook icons, social media links)
-- instagram_url: Instagram URL (look for instagram.com links, Instagram icons, social media links)
-- linkedin_url: LinkedIn URL (look for linkedin.com links, LinkedIn icons, social media links)
-
-Policies:
-- privacy_policy: Privacy policy (look for "privacy policy", "privacy", "data protection")
-- terms_of_service: Terms of service (look for "terms", "terms of service", "terms of use")
-- licenses_certifications: Licenses/certifications
-
-Branding:
-- tagline: Company tagline/slogan (look for slogans, catchphrases, company mottos, short memorable phrases)
-- mission_statement: Mission statement
-
+{field_list}
+{sources_note}
 Text:
 {text}
 """
-    openai.api_key = OPENAI_API_KEY
-    response = openai.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are an expert business information extractor. Extract comprehensive business details from web page text with high accuracy. Be thorough and extract all available information including pricing, locations, policies, and business details."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0
-    )
+    return [
+        {"role": "system", "content": "You are an expert business information extractor. Extract comprehensive business details from web page text with high accuracy. Be thorough and extract all available information including pricing, locations, policies, and business details."},
+        {"role": "user", "content": prompt}
+    ]
+
+def build_extraction_request(text, model="gpt-3.5-turbo", fields=None, with_sources=False):
+    # Trim the crawl text so the whole prompt fits the per-call limit
+    overhead = count_message_tokens(build_extraction_messages("", fields, with_sources), model)
+    text = trim_to_tokens(text, EXTRACTION_PROMPT_TOKEN_LIMIT - overhead, model)
+    return build_extraction_messages(text, fields, with_sources)
+
+def parse_extraction_response(content):
     import json
     try:
-        content = response.choices[0].message.content
         start = content.find('{')
         end = content.rfind('}')
         if start != -1 and end != -1:
             json_str = content[start:end+1]
             result = json.loads(json_str)
             
-            # Flatten nested structure
-            flattened = {}
+            # Flatten nested structure; keys the model returned at the top level are kept too
+            flattened = {k: v for k, v in result.items() if k in BUSINESS_FIELDS}
             for section in ["Basic Info", "Services", "Payments & Policies", "Team", "Social Media", "Policies", "Branding"]:
                 if section in result:
                     flattened.update(result[section])
@@ -131,7 +461,7 @@ Text:
             # Convert arrays to strings and handle dictionaries
             for key, value in flattened.items():
                 if isinstance(value, list):
-                    flattened[key] = ", ".join(value)
+                    flattened[key] = ", ".join(str(v) for v in value)
                 elif isinstance(value, dict):
                     # Convert dict to readable string
                     dict_items = []
@@ -139,6 +469,8 @@ Text:
                         dict_items.append(f"{k}: {v}")
                     flattened[key] = "; ".join(dict_items)
             
+            if isinstance(result.get("_sources"), dict):
+                flattened["_sources"] = result["_sources"]
             return flattened
         else:
             return None
@@ -146,27 +478,79 @@ Text:
         print("LLM extraction error:", e)
         return None
 
+def extract_with_llm(text, model="gpt-3.5-turbo", fields=None, with_sources=False):
+    # Nothing to extract from; don't pay for a call that can only return "Not available"
+    if not text or not text.strip():
+        return None
+    messages = build_extraction_request(text, model, fields, with_sources)
+    if model in LOCAL_MODELS:
+        # Offline stand-in tier: no API call, no tokens spent
+        return parse_extraction_response(LOCAL_MODELS[model](messages))
+    budget = get_budget()
+    reserved = budget.preflight(messages, model, EXTRACTION_COMPLETION_ESTIMATE) + EXTRACTION_COMPLETION_ESTIMATE
+    
+    import openai
+    openai.api_key = OPENAI_API_KEY
+    try:
+        response = openai.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0
+        )
+    except Exception:
+        budget.release(reserved)
+        raise
+    budget.record(response.usage.total_tokens, reserved)
+    return parse_extraction_response(response.choices[0].message.content)
 
-
-def scrape_business_info_with_ai(url):
-    text = scrape_and_collect_text(url)
+def extract_with_provenance(pages, fields=None, model="gpt-3.5-turbo"):
+    # Returns (ai_result, sources) where sources maps field -> {"page_url", "content_hash"}
+    pages = [p for p in pages if p["text"].strip()]
+    if not pages:
+        return None, {}
+    ai_result = extract_with_llm(format_pages(pages), model, fields, with_sources=True)
+    if not ai_result:
+        return None, {}
     
-    # Pure AI Extraction
-    ai_result = extract_with_llm(text)
+    sources = {}
+    for field, ref in (ai_result.pop("_sources", None) or {}).items():
+        match = re.search(r'\d+', str(ref))
+        if field in BUSINESS_FIELDS and match and 1 <= int(match.group()) <= len(pages):
+            page = pages[int(match.group()) - 1]
+            sources[field] = {"page_url": page["url"], "content_hash": page["hash"]}
+    return ai_result, sources
+
+
+
+def extract_fields(pages, fields=None, tiers=None):
+    # Fields the site builder exposes as structured data are taken as-is; the remainder is
+    # routed through the model tiers. Returns (result, sources) like extract_with_provenance
+    wanted = fields or EXTRACTABLE_FIELDS
+    # A full extraction takes every structured field, including ones the model is never asked for
+    accepted = fields or BUSINESS_FIELDS
+    result = {}
+    sources = {}
+    for page in pages:
+        for field, value in (page.get("structured") or {}).items():
+            if field in accepted and field not in result:
+                result[field] = value
+                sources[field] = {"page_url": page["url"], "content_hash": page["hash"]}
     
+    remaining = [f for f in wanted if f in EXTRACTABLE_FIELDS and f not in result and (f != "website_url" or not result)]
+    if remaining:
+        ai_result, ai_sources = route_extraction(pages, remaining, extract_with_provenance, tiers)
+        for field, value in (ai_result or {}).items():
+            result.setdefault(field, value)
+        for field, source in ai_sources.items():
+            sources.setdefault(field, source)
+    return result or None, sources
+
+def finalize_profile(url, ai_result):
     # Ensure all fields exist
-    fields = [
-        "company_name", "address", "phone_number", "email", "website_url", "business_hours", "timezone",
-        "services_list", "service_descriptions", "pricing", "duration", "booking_links", "service_areas",
-        "payment_methods", "financing_plans", "refund_policy",
-        "staff_names", "staff_titles", "staff_bios", "staff_photos",
-        "facebook_url", "instagram_url", "linkedin_url", "social_handles", "promotions", "testimonials",
-        "privacy_policy", "terms_of_service", "licenses_certifications",
-        "tagline", "mission_statement", "communication_style"
-    ]
+    fields = BUSINESS_FIELDS
     
     if not ai_result:
-        return {k: "Not available" for k in fields}
+        return BusinessProfile()
     
     # Set website URL and ensure all fields exist
     ai_result['website_url'] = url
@@ -175,7 +559,32 @@ def scrape_business_info_with_ai(url):
         if field not in ai_result or not ai_result[field]:
             ai_result[field] = "Not available"
     
-    return {k: clean_text(ai_result[k]) for k in fields}
+    return BusinessProfile(**{k: clean_text(ai_result[k]) for k in fields})
+
+def scrape_business_info_with_sources(url, max_pages=8, timings=None):
+    # Returns (profile, pages, sources) so callers can store where each field came from;
+    # per-stage durations are written into timings when a dict is passed
+    started = time.perf_counter()
+    pages = crawl_pages(url, max_pages)
+    crawled = time.perf_counter()
+    
+    # Structured data first, AI extraction for the rest
+    ai_result, sources = extract_fields(pages)
+    extracted = time.perf_counter()
+    
+    if timings is not None:
+        timings["crawl_seconds"] = crawled - started
+        timings["extract_seconds"] = extracted - crawled
+        timings["total_seconds"] = extracted - started
+    
+    for page in pages:
+        page.pop("text", None)
+        page.pop("structured", None)
+    return finalize_profile(url, ai_result), pages, sources
+
+def scrape_business_info_with_ai(url, max_pages=8):
+    profile, _, _ = scrape_business_info_with_sources(url, max_pages)
+    return profile
 
 if __name__ == "__main__":
     url = input("Enter business website URL: ").strip()
@@ -0,0 +1,217 @@
+import json
+from urllib.parse import urljoin, urlparse
+
+from frontier import USER_AGENT
+
+# Substrings of response headers, the generator meta tag and asset URLs that give a builder away.
+# Checked in order; WordPress goes last because other builders' themes sometimes borrow its assets
+PLATFORM_MARKERS = [
+    ("wix", ["x-wix-request-id", "static.parastorage.com", "static.wixstatic.com", "wix.com website builder"]),
+    ("squarespace", ["server: squarespace", "static1.squarespace.com", "assets.squarespace.com", "sqspcdn.com"]),
+    ("shopify", ["x-shopid", "x-shopify-stage", "cdn.shopify.com", "shopify"]),
+    ("godaddy", ["img1.wsimg.com", "go daddy website builder", "starfield technologies"]),
+    ("wordpress", ["/wp-content/", "/wp-includes/", "wp-json", "wordpress"]),
+]
+
+# Where each builder puts contact, services and policy pages by default
+PLATFORM_ROUTES = {
+    "wix": ["/contact", "/services", "/book-online", "/about"],
+    "squarespace": ["/contact", "/services", "/about", "/pricing"],
+    "shopify": ["/pages/contact", "/pages/about", "/policies/refund-policy",
+                "/policies/privacy-policy", "/policies/terms-of-service"],
+    "godaddy": ["/contact-us", "/services", "/about-us"],
+    "wordpress": ["/contact/", "/contact-us/", "/services/", "/about/", "/pricing/"],
+}
+
+# Pages crawled per site once a builder is recognized: the homepage plus its known routes
+PLATFORM_MAX_PAGES = 5
+ROUTE_CHECK_TIMEOUT = 3
+
+SOCIAL_HOSTS = {"facebook.com": "facebook_url", "instagram.com": "instagram_url", "linkedin.com": "linkedin_url"}
+
+
+def fingerprint(headers, content):
+    """Name of the site builder behind a page, or None"""
+    haystack = "\n".join(
+        [f"{k}: {v}" for k, v in (headers or {}).items()]
+        + [content.get("generator") or ""]
+        + (content.get("assets") or [])
+    ).lower()
+    for platform, markers in PLATFORM_MARKERS:
+        if any(marker in haystack for marker in markers):
+            return platform
+    return None
+
+
+def live_routes(base_url, platform, session=None):
+    """The platform's known routes that exist on this site, checked with HEAD over plain HTTP"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    import requests
+
+    session = session or requests.Session()
+    headers = {"User-Agent": USER_AGENT}
+
+    def exists(route):
+        url = urljoin(base_url, route)
+        try:
+            response = session.head(url, allow_redirects=True, timeout=ROUTE_CHECK_TIMEOUT, headers=headers)
+            if response.status_code in (405, 501):
+                # Some servers refuse HEAD; a streamed GET stops after the headers
+                response = session.get(url, allow_redirects=True, timeout=ROUTE_CHECK_TIMEOUT,
+                                       headers=headers, stream=True)
+                response.close()
+        except requests.RequestException:
+            return None
+        # Landing back on the homepage means the route was redirected away, not served
+        if response.status_code < 400 and urlparse(response.url).path.strip("/"):
+            return response.url.split("#")[0]
+        return None
+
+    routes = PLATFORM_ROUTES.get(platform, [])
+    with ThreadPoolExecutor(max_workers=len(routes) or 1) as pool:
+        found = [u for u in pool.map(exists, routes) if u]
+    return list(dict.fromkeys(found))
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _names(value):
+    # schema.org values may be plain strings or objects with a "name"
+    names = []
+    for item in _as_list(value):
+        if isinstance(item, dict):
+            item = item.get("name")
+        if isinstance(item, str) and item.strip():
+            names.append(item.strip())
+    return names
+
+
+def _format_address(address):
+    if isinstance(address, str):
+        return address
+    if not isinstance(address, dict):
+        return None
+    parts = [address.get(k) for k in ("streetAddress", "addressLocality", "addressRegion", "postalCode")]
+    return ", ".join(str(p) for p in parts if p) or None
+
+
+def _format_hours(node):
+    lines = [str(h) for h in _as_list(node.get("openingHours"))]
+    for spec in _as_list(node.get("openingHoursSpecification")):
+        if not isinstance(spec, dict) or not spec.get("opens"):
+            continue
+        days = ", ".join(str(d).rsplit("/", 1)[-1] for d in _as_list(spec.get("dayOfWeek")))
+        lines.append(f"{days} {spec['opens']}-{spec.get('closes', '')}".strip())
+    return "; ".join(lines) or None
+
+
+def _social_fields(urls):
+    fields = {}
+    for url in urls:
+        host = (urlparse(str(url)).hostname or "").lower()
+        for social_host, field in SOCIAL_HOSTS.items():
+            if host == social_host or host.endswith("." + social_host):
+                fields.setdefault(field, url)
+    return fields
+
+
+def _ld_nodes(blocks):
+    # Flatten JSON-LD scripts, including Yoast-style @graph lists, into plain objects
+    nodes = []
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except (TypeError, ValueError):
+            continue
+        stack = _as_list(data)
+        while stack:
+            node = stack.pop(0)
+            if isinstance(node, dict):
+                nodes.append(node)
+                stack.extend(_as_list(node.get("@graph")))
+            elif isinstance(node, list):
+                stack.extend(node)
+    return nodes
+
+
+def jsonld_fields(blocks):
+    """Business fields from schema.org Organization/LocalBusiness markup"""
+    fields = {}
+    for node in _ld_nodes(blocks):
+        types = " ".join(str(t) for t in _as_list(node.get("@type")))
+        if not any(k in node for k in ("telephone", "address", "openingHours", "openingHoursSpecification")) \
+                and "Organization" not in types and "Business" not in types:
+            continue
+        found = {
+            "company_name": node.get("name") if isinstance(node.get("name"), str) else None,
+            "phone_number": node.get("telephone"),
+            "email": str(node["email"]).replace("mailto:", "") if node.get("email") else None,
+            "address": _format_address(node.get("address")),
+            "business_hours": _format_hours(node),
+            "service_areas": ", ".join(_names(node.get("areaServed"))) or None,
+            "pricing": node.get("priceRange"),
+            "payment_methods": ", ".join(_names(node.get("paymentAccepted"))) or None,
+            "tagline": node.get("slogan"),
+        }
+        # A catalog may be an OfferCatalog, a list of them, or just a name
+        offers = []
+        for catalog in _as_list(node.get("hasOfferCatalog")):
+            if isinstance(catalog, dict):
+                offers.extend(o.get("itemOffered", o) if isinstance(o, dict) else o
+                              for o in _as_list(catalog.get("itemListElement")))
+            else:
+                offers.append(catalog)
+        found["services_list"] = ", ".join(_names(offers)) or None
+        found.update(_social_fields(_as_list(node.get("sameAs"))))
+        for field, value in found.items():
+            if value and isinstance(value, str):
+                fields.setdefault(field, value.strip())
+    return fields
+
+
+def _squarespace_fields(content, links):
+    website = content.get("squarespace") or {}
+    location = website.get("location") or {}
+    hours = website.get("businessHours") or {}
+    fields = {
+        "company_name": website.get("siteTitle"),
+        "timezone": website.get("timeZone"),
+        "address": ", ".join(location[k] for k in ("addressLine1", "addressLine2") if location.get(k)) or None,
+        "business_hours": "; ".join(
+            f"{day.title()} {hours[day]['text']}" for day in hours
+            if isinstance(hours[day], dict) and hours[day].get("text")
+        ) or None,
+    }
+    fields.update(_social_fields(a.get("profileUrl") for a in website.get("socialAccounts") or [] if isinstance(a, dict)))
+    return fields
+
+
+def _wix_fields(content, links):
+    # Wix Bookings always serves its booking page at /book-online
+    booking = [link for link in links if urlparse(link).path.rstrip("/").endswith("/book-online")]
+    return {"booking_links": booking[0] if booking else None}
+
+
+PLATFORM_EXTRACTORS = {
+    "squarespace": _squarespace_fields,
+    "wix": _wix_fields,
+}
+
+
+def structured_fields(platform, content, links):
+    """Fields read straight from a page's embedded data, without the model
+
+    JSON-LD is used on every page; builders with their own embedded site data add to it.
+    """
+    fields = {}
+    extractor = PLATFORM_EXTRACTORS.get(platform)
+    if extractor:
+        fields.update({k: v.strip() for k, v in extractor(content, links).items() if isinstance(v, str) and v.strip()})
+    for field, value in jsonld_fields(content.get("jsonld") or []).items():
+        fields.setdefault(field, value)
+    return fields
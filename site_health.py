@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+
+from frontier import USER_AGENT, _host
+
+PREFLIGHT_TIMEOUT = float(os.getenv("PREFLIGHT_TIMEOUT", "3"))
+NEGATIVE_CACHE_SECONDS = int(os.getenv("NEGATIVE_CACHE_SECONDS", "3600"))
+BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN_SECONDS = int(os.getenv("BREAKER_COOLDOWN_SECONDS", "600"))
+
+# Homepage statuses that mean there is nothing to render. 403/429/503 are left to the browser:
+# bot-protection fronts send them to plain clients and often let a real browser through
+DEAD_STATUSES = {404, 410, 500, 502, 504, 521, 522, 523, 524, 530}
+
+
+def probe_site(url):
+    """DNS, TCP and HEAD checks in a few seconds at most; returns a failure reason or None"""
+    import socket
+    from urllib.parse import urlparse
+
+    import requests
+
+    parsed = urlparse(url)
+    host = parsed.hostname
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        return "DNS lookup failed"
+    try:
+        socket.create_connection((host, port), timeout=PREFLIGHT_TIMEOUT).close()
+    except OSError:
+        return f"no connection on port {port}"
+    headers = {"User-Agent": USER_AGENT}
+    try:
+        response = requests.head(url, allow_redirects=True, timeout=PREFLIGHT_TIMEOUT, headers=headers)
+        if response.status_code in DEAD_STATUSES or response.status_code in (405, 501):
+            # Plenty of servers mishandle HEAD; a streamed GET stops after the headers
+            response = requests.get(url, allow_redirects=True, timeout=PREFLIGHT_TIMEOUT,
+                                    headers=headers, stream=True)
+            response.close()
+    except requests.RequestException as e:
+        return f"HTTP request failed ({type(e).__name__})"
+    if response.status_code in DEAD_STATUSES:
+        return f"homepage returned HTTP {response.status_code}"
+    return None
+
+
+class CircuitBreaker:
+    """Per-domain failure tracking shared by every crawl in the process
+
+    A domain that fails preflight, or fails threshold page loads in a row, is skipped
+    until cooldown seconds have passed.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN_SECONDS):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = {}
+        self.open_until = {}
+        self.reasons = {}
+        self.lock = threading.Lock()
+
+    def blocked(self, domain):
+        """Reason the domain is being skipped, or None"""
+        with self.lock:
+            if self.open_until.get(domain, 0) > time.time():
+                return self.reasons[domain]
+            return None
+
+    def trip(self, domain, reason, cooldown=None):
+        with self.lock:
+            self.open_until[domain] = time.time() + (self.cooldown if cooldown is None else cooldown)
+            self.reasons[domain] = reason
+            self.failures.pop(domain, None)
+
+    def record_failure(self, domain):
+        """Count a failed page load; returns True when this failure opens the circuit"""
+        with self.lock:
+            self.failures[domain] = self.failures.get(domain, 0) + 1
+            if self.failures[domain] < self.threshold:
+                return False
+        self.trip(domain, f"{self.threshold} page loads failed in a row")
+        return True
+
+    def record_success(self, domain):
+        with self.lock:
+            self.failures.pop(domain, None)
+
+
+_breaker = CircuitBreaker()
+
+
+def get_breaker():
+    return _breaker
+
+
+def check_site(url):
+    """Fast-fail gate before any browser work; returns a reason to skip the site, or None
+
+    Failed probes are cached for NEGATIVE_CACHE_SECONDS, so repeated or aliased rows of a
+    dead site in a batch cost a dictionary lookup.
+    """
+    domain = _host(url)
+    reason = _breaker.blocked(domain)
+    if reason:
+        return reason
+    reason = probe_site(url)
+    if reason:
+        _breaker.trip(domain, reason, NEGATIVE_CACHE_SECONDS)
+    return reason
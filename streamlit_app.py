@@ -8,12 +8,15 @@ import json
 import re
 import time
 import os
-import openai
-from scraper import scrape_business_info_with_ai
-from docx import Document
-from docx.shared import Inches
+from profile_store import open_store, get_profile, save_crawl, is_empty_profile
+from canonical_urls import normalize_url
+from analysis import (
+    ANALYSIS_MODE, analysis_messages, build_compact_analysis_messages,
+    fan_out, render_templates, run_analysis,
+)
 import io
 import base64
+import glob
 
 # Page configuration
 st.set_page_config(
@@ -65,6 +68,9 @@ st.markdown("""
 # OpenAI API Key
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+MODELS = ["gpt-3.5-turbo", "gpt-4", "gpt-4-turbo"]
+DEFAULT_TEMPLATE = "prompt_template.txt"
+
 def load_template(template_file="prompt_template.txt"):
     """Load the prompt template from file"""
     try:
@@ -136,57 +142,22 @@ def replace_placeholders(template, data_mapping):
         result = result.replace(placeholder, str(value))
     return result
 
-def test_gpt_response(final_prompt, model="gpt-3.5-turbo"):
-    """Test GPT API with the generated prompt"""
-    try:
-        # Configure OpenAI
-        openai.api_key = OPENAI_API_KEY
-        
-        # Create a test prompt
-        test_prompt = f"""
-Based on the following business information, provide a comprehensive analysis and suggestions:
-
-{final_prompt}
-
-Please provide:
-1. Business Overview (2-3 sentences)
-2. Key Strengths (3-4 points)
-3. Marketing Suggestions (3-4 ideas)
-4. Potential Improvements (2-3 suggestions)
-5. Target Audience Analysis (1-2 sentences)
-
-Format your response professionally with clear sections.
-"""
-        
-        # Make API call
-        response = openai.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are a professional business analyst and marketing consultant. Provide clear, actionable insights based on business information."},
-                {"role": "user", "content": test_prompt}
-            ],
-            max_tokens=800,
-            temperature=0.7
-        )
-        
-        gpt_response = response.choices[0].message.content
-        
-        # Show response stats
-        response_tokens = response.usage.total_tokens
-        prompt_tokens = response.usage.prompt_tokens
-        completion_tokens = response.usage.completion_tokens
-        
-        return True, gpt_response, {
-            'total_tokens': response_tokens,
-            'prompt_tokens': prompt_tokens,
-            'completion_tokens': completion_tokens
-        }
-        
-    except Exception as e:
-        return False, str(e), None
+def test_gpt_response(final_prompt, model="gpt-3.5-turbo", scraped_data=None, mode=ANALYSIS_MODE):
+    """Test GPT API with the generated prompt or the compact profile"""
+    result = run_analysis(analysis_messages(final_prompt, scraped_data, mode), model)
+    if result['error']:
+        return False, result['error'], None
+    
+    return True, result['response'], {
+        'total_tokens': result['total_tokens'],
+        'prompt_tokens': result['prompt_tokens'],
+        'completion_tokens': result['completion_tokens']
+    }
 
 def create_docx_download(final_prompt, gpt_response, company_name="Business"):
     """Create a DOCX file for download"""
+    from docx import Document
+    
     doc = Document()
     
     # Add title
@@ -235,15 +206,34 @@ def main():
         # Model selection
         model = st.selectbox(
             "GPT Model",
-            ["gpt-3.5-turbo", "gpt-4", "gpt-4-turbo"],
+            MODELS,
             index=0
         )
         
+        # Extra models and templates analysed from the same scrape
+        compare_models = st.multiselect(
+            "Compare with models",
+            [m for m in MODELS if m != model]
+        )
+        compare_templates = st.multiselect(
+            "Compare with templates",
+            [t for t in sorted(glob.glob("*template*.txt")) if t != DEFAULT_TEMPLATE]
+        )
+        
         # Max pages for scraping
         max_pages = st.slider("Max Pages to Scrape", 3, 15, 8)
         
         # Test GPT API option
         test_gpt = st.checkbox("Test with GPT API", value=True)
+        compact = st.checkbox(
+            "Send only found fields to GPT",
+            value=ANALYSIS_MODE == "compact",
+            help="Smaller, faster analysis requests; template comparison always sends full prompts"
+        )
+        analysis_mode = "compact" if compact else "template"
+        
+        # Reuse previously extracted profiles
+        use_store = st.checkbox("Reuse stored profiles", value=True)
         
         st.markdown("---")
         st.markdown("### About")
@@ -273,11 +263,9 @@ def main():
             st.error("❌ Please enter a valid website URL")
             return
         
-        # Basic URL validation
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-        
-        if '.' not in url or len(url) < 10:
+        # Normalize scheme/host and validate
+        url = normalize_url(url)
+        if not url:
             st.error("❌ Please enter a valid website URL (e.g., https://example.com)")
             return
         
@@ -300,11 +288,22 @@ def main():
             status_text.text("🔍 Scraping website data...")
             progress_bar.progress(20)
             
-            scraped_data = scrape_business_info_with_ai(url)
+            store = open_store()
+            scraped_data = None
+            if use_store:
+                scraped_data, meta = get_profile(store, url)
+                if scraped_data:
+                    status_text.text(f"⚡ Using stored profile for {meta['domain']} (crawled {meta['crawled_at']})")
+            
             if not scraped_data:
-                st.error("❌ Failed to scrape data from the website")
-                st.info("💡 Possible reasons:\n• Website might be blocking automated access\n• URL might be incorrect\n• Network connection issues")
-                return
+                from scraper import scrape_business_info_with_sources
+                scraped_data, pages, sources = scrape_business_info_with_sources(url, max_pages=max_pages)
+                if not scraped_data:
+                    st.error("❌ Failed to scrape data from the website")
+                    st.info("💡 Possible reasons:\n• Website might be blocking automated access\n• URL might be incorrect\n• Network connection issues")
+                    return
+                if not is_empty_profile(scraped_data):
+                    save_crawl(store, url, scraped_data, pages, sources)
             
             st.session_state.scraped_data = scraped_data
             progress_bar.progress(40)
@@ -329,10 +328,39 @@ def main():
             progress_bar.progress(80)
             
             # Step 5: Test GPT API if requested
-            if test_gpt:
+            st.session_state.comparison = None
+            if test_gpt and (compare_models or compare_templates):
+                # Fan the one scraped profile out to every selected template and model at once
+                status_text.text("🤖 Running model comparison...")
+                if compare_templates or analysis_mode != "compact":
+                    prompts = {DEFAULT_TEMPLATE: final_prompt}
+                    prompts.update(render_templates(scraped_data, compare_templates))
+                    results = fan_out(prompts, [model] + compare_models)
+                else:
+                    results = fan_out({"compact profile": scraped_data}, [model] + compare_models,
+                                      build=build_compact_analysis_messages)
+                st.session_state.comparison = results
+                
+                primary = results[0]
+                test_success = primary['error'] is None
+                st.session_state.gpt_response = primary['response']
+                st.session_state.api_stats = {
+                    'total_tokens': primary['total_tokens'],
+                    'prompt_tokens': primary['prompt_tokens'],
+                    'completion_tokens': primary['completion_tokens']
+                } if test_success else None
+                
+                if test_success:
+                    progress_bar.progress(100)
+                    status_text.text("✅ Process completed successfully!")
+                else:
+                    progress_bar.progress(90)
+                    status_text.text("⚠️ Process completed with GPT API error")
+            elif test_gpt:
                 status_text.text("🤖 Testing with GPT API...")
-                test_success, gpt_response, api_stats = test_gpt_response(final_prompt, model)
+                test_success, gpt_response, api_stats = test_gpt_response(final_prompt, model, scraped_data, analysis_mode)
                 st.session_state.gpt_response = gpt_response if test_success else None
+                st.session_state.api_stats = api_stats
                 
                 if test_success:
                     progress_bar.progress(100)
@@ -434,6 +462,25 @@ def main():
                     st.write(f"• Total Tokens: {stats['total_tokens']}")
                     st.write(f"• Prompt Tokens: {stats['prompt_tokens']}")
                     st.write(f"• Response Tokens: {stats['completion_tokens']}")
+        
+        # Side-by-side comparison
+        if st.session_state.get('comparison'):
+            st.markdown("**⚖️ Model & Template Comparison**")
+            results = st.session_state.comparison
+            for template_name in dict.fromkeys(r['template'] for r in results):
+                st.markdown(f"*{template_name}*")
+                row = [r for r in results if r['template'] == template_name]
+                for col, result in zip(st.columns(len(row)), row):
+                    with col:
+                        st.markdown(f"**{result['model']}**")
+                        if result['error']:
+                            st.error(result['error'])
+                            continue
+                        st.caption(
+                            f"⏱️ {result['latency_seconds']:.1f}s • "
+                            f"{result['prompt_tokens']} prompt / {result['completion_tokens']} response tokens"
+                        )
+                        st.markdown(result['response'])
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
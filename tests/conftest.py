@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """Run every test in its own directory with fresh process-wide singletons"""
+    import model_router
+    import site_health
+    import token_budget
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(token_budget, "_budget", token_budget.TokenBudget(usage_db=str(tmp_path / "usage.db")))
+    monkeypatch.setattr(model_router, "_stats", model_router.TierStats(usage_db=str(tmp_path / "usage.db")))
+    monkeypatch.setattr(site_health, "_breaker", site_health.CircuitBreaker())
@@ -0,0 +1,112 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from batch_extract import (
+    LocalBatchBackend, OpenAIBatchBackend, custom_id_for, iter_batch_results, manifest_path, submit_batch,
+)
+from token_budget import TokenBudget, TokenBudgetExceeded
+
+
+def write_batch(path, requests, manifest):
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request) + "\n")
+    with open(manifest_path(path), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+
+def test_local_backend_round_trip(tmp_path):
+    batch_file = str(tmp_path / "batch.jsonl")
+    url = "https://acme.com/"
+    custom_id = custom_id_for(url)
+    request = {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": "text"}]},
+    }
+    write_batch(batch_file, [request], {custom_id: {"url": url, "structured": {"timezone": "America/Denver"}}})
+
+    backend = LocalBatchBackend(str(tmp_path / "out"), responder=lambda body: '{"company_name": "Acme"}')
+    batch_id = backend.submit(batch_file)
+    assert backend.status(batch_id) == "completed"
+
+    [(result_url, profile)] = list(iter_batch_results(batch_id, backend, batch_file))
+    assert result_url == url
+    assert profile["company_name"] == "Acme"
+    assert profile["timezone"] == "America/Denver"
+    assert profile["website_url"] == url
+    assert profile["email"] == "Not available"
+
+
+def test_old_manifest_format(tmp_path):
+    batch_file = str(tmp_path / "batch.jsonl")
+    url = "https://acme.com/"
+    custom_id = custom_id_for(url)
+    request = {"custom_id": custom_id, "body": {"messages": [{"role": "user", "content": "text"}]}}
+    write_batch(batch_file, [request], {custom_id: url})
+
+    backend = LocalBatchBackend(str(tmp_path / "out"))
+    [(result_url, profile)] = list(iter_batch_results(backend.submit(batch_file), backend, batch_file))
+    assert result_url == url
+    assert profile["company_name"] == "Not available"
+
+
+def test_submit_enforces_the_token_caps(tmp_path, monkeypatch):
+    import token_budget
+
+    batch_file = str(tmp_path / "batch.jsonl")
+    request = {"custom_id": "url-1", "body": {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": "x" * 4000}]}}
+    write_batch(batch_file, [request], {"url-1": "https://acme.com/"})
+    monkeypatch.setattr(token_budget, "_budget", TokenBudget(batch_cap=500, usage_db=str(tmp_path / "caps.db")))
+
+    submitted = []
+    backend = LocalBatchBackend(str(tmp_path / "out"))
+    monkeypatch.setattr(backend, "submit", submitted.append)
+    with pytest.raises(TokenBudgetExceeded):
+        submit_batch(backend, batch_file)
+    assert submitted == []
+
+
+def test_prepare_refuses_before_crawling(tmp_path, monkeypatch):
+    import batch_extract
+    import token_budget
+
+    monkeypatch.setattr(token_budget, "_budget", TokenBudget(batch_cap=10_000, usage_db=str(tmp_path / "caps.db")))
+    monkeypatch.setattr(batch_extract, "crawl_pages", lambda url, max_pages: pytest.fail("crawled"))
+    with pytest.raises(TokenBudgetExceeded):
+        batch_extract.prepare_batch([f"https://site{i}.com/" for i in range(100)], str(tmp_path / "batch.jsonl"))
+    assert not (tmp_path / "batch.jsonl").exists()
+
+
+class FakeFiles:
+    def __init__(self, contents):
+        self.contents = contents
+
+    def content(self, file_id):
+        return SimpleNamespace(text=self.contents[file_id])
+
+
+def test_failed_requests_are_reported(tmp_path, capsys):
+    batch_file = str(tmp_path / "batch.jsonl")
+    urls = {custom_id_for(u): u for u in ["https://ok.com/", "https://bad.com/", "https://lost.com/"]}
+    write_batch(batch_file, [], {cid: {"url": u, "structured": {}} for cid, u in urls.items()})
+    ok, bad, _ = urls
+    output = {"custom_id": ok, "response": {"status_code": 200, "body": {
+        "choices": [{"message": {"content": '{"company_name": "OK"}'}}], "usage": {"total_tokens": 10}}}, "error": None}
+    error = {"custom_id": bad, "response": None, "error": {"code": "invalid_request", "message": "too long"}}
+
+    backend = OpenAIBatchBackend.__new__(OpenAIBatchBackend)
+    backend.client = SimpleNamespace(
+        batches=SimpleNamespace(retrieve=lambda batch_id: SimpleNamespace(output_file_id="out", error_file_id="err")),
+        files=FakeFiles({"out": json.dumps(output), "err": json.dumps(error)}),
+    )
+    profiles = dict(iter_batch_results("batch-1", backend, batch_file))
+    assert profiles["https://ok.com/"]["company_name"] == "OK"
+    assert profiles["https://bad.com/"]["company_name"] == "Not available"
+    assert profiles["https://lost.com/"]["company_name"] == "Not available"
+    printed = capsys.readouterr().out
+    assert "❌ https://bad.com/: {'code': 'invalid_request'" in printed
+    assert "❌ https://lost.com/: no result in batch output" in printed
@@ -0,0 +1,40 @@
+import pytest
+
+from canonical_urls import collapse_sites, normalize_url
+from profile_store import get_redirect, open_store, put_redirects
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Example.com", "https://example.com/"),
+    ("http://WWW.Example.com:80/About", "http://www.example.com/About"),
+    ("https://example.com:8443/x", "https://example.com:8443/x"),
+    ("example.com:abc", None),
+    ("http://[::1", None),
+    ("localhost", None),
+    ("   ", None),
+])
+def test_normalize_url(raw, expected):
+    assert normalize_url(raw) == expected
+
+
+def test_collapse_sites_without_resolving():
+    urls = ["example.com", "https://www.example.com/about", "http://example.com:80/", "other.org", "example.com:abc"]
+    sites, site_for = collapse_sites(urls, resolve=False)
+    assert sites == ["https://example.com/", "https://other.org/"]
+    assert site_for["https://www.example.com/about"] == "https://example.com/"
+    assert "example.com:abc" not in site_for
+
+
+def test_collapse_sites_uses_cached_redirects(tmp_path):
+    conn = open_store(str(tmp_path / "profiles.db"))
+    put_redirects(conn, [("old-brand.com", "https://newbrand.com/"), ("newbrand.com", "https://newbrand.com/")])
+    sites, site_for = collapse_sites(["old-brand.com", "https://newbrand.com/contact"], conn)
+    assert sites == ["https://newbrand.com/"]
+    assert site_for["old-brand.com"] == "https://newbrand.com/"
+
+
+def test_cached_redirects_expire(tmp_path):
+    conn = open_store(str(tmp_path / "profiles.db"))
+    put_redirects(conn, [("old-brand.com", "https://newbrand.com/")])
+    conn.execute("UPDATE redirects SET resolved_at = '2000-01-01T00:00:00+00:00'")
+    assert get_redirect(conn, "old-brand.com") is None
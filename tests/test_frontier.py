@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import pytest
+
+from frontier import link_score, load_robots
+
+
+class RobotsSession:
+    def __init__(self, status_code, text=""):
+        self.response = SimpleNamespace(status_code=status_code, text=text)
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+@pytest.mark.parametrize("status", [401, 403, 404, 410, 429])
+def test_any_4xx_on_robots_allows_everything(status):
+    pytest.importorskip("requests")
+    robots = load_robots("https://acme.com/", RobotsSession(status))
+    assert robots.can_fetch("*", "https://acme.com/")
+    assert robots.can_fetch("*", "https://acme.com/contact")
+
+
+def test_robots_rules_are_applied():
+    pytest.importorskip("requests")
+    robots = load_robots("https://acme.com/", RobotsSession(200, "User-agent: *\nDisallow: /private"))
+    assert robots.can_fetch("*", "https://acme.com/contact")
+    assert not robots.can_fetch("*", "https://acme.com/private/page")
+
+
+def test_link_score():
+    assert link_score("https://acme.com/contact-us") > link_score("https://acme.com/about") > 0
+    assert link_score("https://acme.com/blog/post-1") == 0
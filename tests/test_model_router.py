@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+import model_router
+import scraper
+from model_router import field_problem, get_tier_stats, register_local_model
+
+PAGES = [{"url": "https://acme.com/", "hash": "h", "text": "Acme Plumbing. Email hi@acme.com or call 555 123 4567"}]
+
+
+@pytest.fixture(autouse=True)
+def local_models():
+    saved = dict(model_router.LOCAL_MODELS)
+    yield
+    model_router.LOCAL_MODELS.clear()
+    model_router.LOCAL_MODELS.update(saved)
+
+
+@pytest.fixture
+def tiers():
+    asked = {}
+
+    def tier(name, answer):
+        def respond(messages):
+            asked[name] = messages[-1]["content"]
+            return json.dumps(answer)
+        register_local_model(name, respond)
+
+    tier("cheap", {"company_name": "Acme Plumbing", "email": "made@up.com", "phone_number": "12"})
+    tier("strong", {"email": "hi@acme.com", "phone_number": "555-123-4567", "company_name": "Wrong"})
+    return asked
+
+
+def test_only_failed_fields_escalate(tiers):
+    result, _ = scraper.extract_fields(PAGES, tiers=["cheap", "strong"])
+    assert result == {"company_name": "Acme Plumbing", "email": "hi@acme.com", "phone_number": "555-123-4567"}
+    assert "company_name:" not in tiers["strong"]
+    assert "- email:" in tiers["strong"] and "- phone_number:" in tiers["strong"]
+
+
+def test_missing_fields_do_not_escalate_by_default():
+    calls = []
+    register_local_model("strong", lambda messages: calls.append(1) or "{}")
+    result, _ = scraper.extract_fields(PAGES, tiers=["local", "strong"])
+    assert result is None
+    assert calls == []
+
+
+def test_tier_stats(tiers):
+    scraper.extract_fields(PAGES, fields=["company_name", "email", "phone_number"], tiers=["cheap", "strong"])
+    stats = {s["tier"]: s for s in get_tier_stats().summary()}
+    assert stats["cheap"]["fields_requested"] == 3 and stats["cheap"]["fields_accepted"] == 1
+    assert stats["strong"]["fields_requested"] == 2 and stats["strong"]["hit_rate"] == 1.0
+
+
+def test_no_text_means_no_model_call(tiers):
+    assert scraper.extract_fields([dict(PAGES[0], text="  ")], tiers=["cheap", "strong"]) == (None, {})
+    assert tiers == {}
+
+
+def test_structured_fields_skip_the_model(tiers):
+    pages = [dict(PAGES[0], structured={"company_name": "Acme", "timezone": "America/Denver"})]
+    result, sources = scraper.extract_fields(pages, tiers=["cheap", "strong"])
+    assert result["company_name"] == "Acme"
+    assert result["timezone"] == "America/Denver"
+    assert sources["timezone"]["page_url"] == "https://acme.com/"
+    assert "company_name:" not in tiers["cheap"]
+
+
+@pytest.mark.parametrize("field, value, problem", [
+    ("email", "Not available", "missing"),
+    ("email", "hi at acme", "malformed"),
+    ("email", "other@acme.com", "low_confidence"),
+    ("email", "hi@acme.com", None),
+    ("phone_number", "12", "malformed"),
+    ("phone_number", "(555) 123-4567", None),
+    ("facebook_url", "https://twitter.com/acme", "malformed"),
+    ("pricing", "$50", None),
+])
+def test_field_problem(field, value, problem):
+    assert field_problem(field, value, PAGES[0]["text"]) == problem
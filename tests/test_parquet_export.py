@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from parquet_export import ProfileParquetWriter, RollingParquetWriter, read_profiles
+
+
+def test_file_appears_only_on_close(tmp_path):
+    tmp_path = tmp_path / "export"
+    path = tmp_path / "out.parquet"
+    writer = ProfileParquetWriter(str(path))
+    writer.write("https://acme.com/", {"company_name": "Acme"}, {"total_seconds": 1.5})
+    assert not path.exists()
+    writer.close()
+
+    table = read_profiles(str(path), columns=["domain", "company_name", "email", "total_seconds"])
+    assert table.to_pylist() == [
+        {"domain": "acme.com", "company_name": "Acme", "email": "Not available", "total_seconds": 1.5},
+    ]
+    assert os.listdir(tmp_path) == ["out.parquet"]
+
+
+def test_rolling_parts_survive_an_unclean_exit(tmp_path):
+    tmp_path = tmp_path / "export"
+    writer = RollingParquetWriter(str(tmp_path), "profiles-w1", row_group_size=2)
+    for i in range(5):
+        writer.write(f"https://site{i}.com/", {"company_name": f"Site {i}"})
+    # Killed before close: the fifth row's part was never finished
+
+    assert sorted(p for p in os.listdir(tmp_path) if not p.startswith(".")) == [
+        "profiles-w1-00000.parquet", "profiles-w1-00001.parquet",
+    ]
+    names = sorted(read_profiles(str(tmp_path), columns=["company_name"]).column("company_name").to_pylist())
+    assert names == [f"Site {i}" for i in range(4)]
+
+    writer.close()
+    assert read_profiles(str(tmp_path)).num_rows == 5
@@ -0,0 +1,69 @@
+from profile_store import (
+    canonical_domain, get_profile, is_empty_profile, open_store, put_redirects,
+    recently_updated, search_profiles, upsert_profile, upsert_profiles,
+)
+from scraper import BusinessProfile
+
+ACME = {"company_name": "Acme Plumbing", "services_list": "Drain cleaning, water heaters", "service_areas": "Denver"}
+
+
+def test_canonical_domain():
+    assert canonical_domain("HTTPS://WWW.Acme.com./contact") == "acme.com"
+    assert canonical_domain("acme.com") == "acme.com"
+
+
+def test_upsert_keys_by_domain(tmp_path):
+    conn = open_store(str(tmp_path / "profiles.db"))
+    upsert_profile(conn, "https://www.acme.com/", ACME)
+    upsert_profile(conn, "http://acme.com/about", dict(ACME, company_name="Acme Plumbing LLC"))
+    assert conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0] == 1
+
+    profile, meta = get_profile(conn, "acme.com")
+    assert isinstance(profile, BusinessProfile)
+    assert profile["company_name"] == "Acme Plumbing LLC"
+    assert profile["email"] == "Not available"
+    assert meta["url"] == "http://acme.com/about"
+    assert get_profile(conn, "unknown.com") == (None, None)
+
+
+def test_updated_at_moves_only_when_content_changes(tmp_path):
+    conn = open_store(str(tmp_path / "profiles.db"))
+    upsert_profile(conn, "acme.com", ACME, crawled_at="2026-01-01T00:00:00+00:00")
+    upsert_profile(conn, "acme.com", ACME, crawled_at="2026-02-01T00:00:00+00:00")
+    _, meta = get_profile(conn, "acme.com")
+    assert meta["crawled_at"] == "2026-02-01T00:00:00+00:00"
+    assert meta["updated_at"] == "2026-01-01T00:00:00+00:00"
+
+    upsert_profile(conn, "acme.com", dict(ACME, email="hi@acme.com"), crawled_at="2026-03-01T00:00:00+00:00")
+    _, meta = get_profile(conn, "acme.com")
+    assert meta["updated_at"] == "2026-03-01T00:00:00+00:00"
+    assert [m["domain"] for _, m in recently_updated(conn, "2026-02-15")] == ["acme.com"]
+    assert recently_updated(conn, "2026-04-01") == []
+
+
+def test_full_text_search_follows_updates(tmp_path):
+    conn = open_store(str(tmp_path / "profiles.db"))
+    upsert_profiles(conn, [
+        ("acme.com", ACME),
+        ("sparky.com", {"company_name": "Sparky", "services_list": "Electrical repair", "service_areas": "Boulder"}),
+    ])
+    assert [m["domain"] for _, m in search_profiles(conn, "drain")] == ["acme.com"]
+    assert [m["domain"] for _, m in search_profiles(conn, "boulder electrical")] == ["sparky.com"]
+    assert search_profiles(conn, '"  ') == []
+
+    upsert_profile(conn, "acme.com", dict(ACME, services_list="Roofing"))
+    assert search_profiles(conn, "drain") == []
+    assert [m["domain"] for _, m in search_profiles(conn, "roofing")] == ["acme.com"]
+
+
+def test_get_profile_follows_cached_redirects(tmp_path):
+    conn = open_store(str(tmp_path / "profiles.db"))
+    upsert_profile(conn, "https://newbrand.com/", ACME)
+    put_redirects(conn, [("old-brand.com", "https://newbrand.com/")])
+    profile, meta = get_profile(conn, "https://www.old-brand.com/")
+    assert meta["domain"] == "newbrand.com"
+
+
+def test_is_empty_profile():
+    assert is_empty_profile(BusinessProfile(website_url="https://acme.com/"))
+    assert not is_empty_profile({"website_url": "https://acme.com/", "email": "hi@acme.com"})
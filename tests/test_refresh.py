@@ -0,0 +1,70 @@
+import pytest
+
+import refresh
+from profile_store import get_field_sources, get_pages, get_profile, open_store, save_crawl
+from scraper import HASH_KIND_HTML_TEXT, BusinessProfile
+
+URL = "https://acme.com/"
+CONTACT = "https://acme.com/contact"
+
+
+@pytest.fixture
+def store(tmp_path):
+    conn = open_store(str(tmp_path / "profiles.db"))
+    profile = {"website_url": URL, "company_name": "Acme", "email": "hi@acme.com", "pricing": "$50"}
+    pages = [
+        {"url": URL, "hash": "home", "hash_kind": HASH_KIND_HTML_TEXT},
+        {"url": CONTACT, "hash": "contact", "hash_kind": HASH_KIND_HTML_TEXT},
+    ]
+    sources = {
+        "company_name": {"page_url": CONTACT, "content_hash": "contact"},
+        "email": {"page_url": CONTACT, "content_hash": "contact"},
+        "pricing": {"page_url": URL, "content_hash": "home"},
+    }
+    save_crawl(conn, URL, profile, pages, sources)
+    return conn
+
+
+@pytest.fixture
+def contact_changed(monkeypatch):
+    monkeypatch.setattr(refresh, "check_page", lambda session, page: "contact-v2" if page["url"] == CONTACT else None)
+
+
+def stub_render(monkeypatch, pages, result=None, sources=None):
+    monkeypatch.setattr(refresh, "render_pages", lambda urls: [dict(p) for p in pages])
+    monkeypatch.setattr(refresh, "extract_fields", lambda pages, fields: (result, sources or {}))
+
+
+def test_unchanged_site_is_returned_as_stored(store, monkeypatch):
+    monkeypatch.setattr(refresh, "check_page", lambda session, page: None)
+    profile, changed = refresh.refresh_profile(store, URL, session=object())
+    assert isinstance(profile, BusinessProfile)
+    assert profile["email"] == "hi@acme.com"
+    assert changed == []
+
+
+def test_failed_render_keeps_fields_and_old_hash(store, monkeypatch, contact_changed):
+    stub_render(monkeypatch, [])
+    profile, changed = refresh.refresh_profile(store, URL, session=object())
+
+    assert changed == [CONTACT]
+    assert isinstance(profile, BusinessProfile)
+    assert profile["company_name"] == "Acme" and profile["email"] == "hi@acme.com"
+    assert get_profile(store, URL)[0]["email"] == "hi@acme.com"
+    assert set(get_field_sources(store, URL)) == {"company_name", "email", "pricing"}
+    assert {p["url"]: p["hash"] for p in get_pages(store, URL)}[CONTACT] == "contact"
+
+
+def test_field_gone_from_refetched_page_is_dropped(store, monkeypatch, contact_changed):
+    page = {"url": CONTACT, "hash": "contact-v2", "hash_kind": HASH_KIND_HTML_TEXT, "text": "Acme Inc"}
+    stub_render(monkeypatch, [page], {"company_name": "Acme Inc"},
+                {"company_name": {"page_url": CONTACT, "content_hash": "contact-v2"}})
+    profile, _ = refresh.refresh_profile(store, URL, session=object())
+
+    assert profile["company_name"] == "Acme Inc"
+    assert profile["email"] == "Not available"
+    assert profile["pricing"] == "$50"
+    sources = get_field_sources(store, URL)
+    assert "email" not in sources
+    assert sources["company_name"]["content_hash"] == "contact-v2"
+    assert {p["url"]: p["hash"] for p in get_pages(store, URL)}[CONTACT] == "contact-v2"
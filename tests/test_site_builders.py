@@ -0,0 +1,108 @@
+import json
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+import pytest
+
+from site_builders import fingerprint, jsonld_fields, live_routes, structured_fields
+
+
+def ld(node):
+    return [json.dumps(node)]
+
+
+def test_local_business_fields():
+    fields = jsonld_fields(ld({
+        "@context": "https://schema.org",
+        "@graph": [
+            {"@type": "WebSite", "name": "Acme site"},
+            {
+                "@type": ["LocalBusiness", "Plumber"],
+                "name": "Acme Plumbing",
+                "telephone": "555-123-4567",
+                "email": "mailto:hi@acme.com",
+                "address": {"streetAddress": "1 Main St", "addressLocality": "Town", "postalCode": "12345"},
+                "openingHoursSpecification": [
+                    {"dayOfWeek": ["https://schema.org/Monday", "Tuesday"], "opens": "09:00", "closes": "17:00"},
+                ],
+                "sameAs": ["https://www.facebook.com/acme", "https://example.com/acme"],
+            },
+        ],
+    }))
+    assert fields == {
+        "company_name": "Acme Plumbing",
+        "phone_number": "555-123-4567",
+        "email": "hi@acme.com",
+        "address": "1 Main St, Town, 12345",
+        "business_hours": "Monday, Tuesday 09:00-17:00",
+        "facebook_url": "https://www.facebook.com/acme",
+    }
+
+
+def test_offer_catalog_shapes():
+    as_list = jsonld_fields(ld({
+        "@type": "LocalBusiness",
+        "hasOfferCatalog": [{"itemListElement": [{"itemOffered": {"name": "Cuts"}}, "Color"]}],
+    }))
+    assert as_list["services_list"] == "Cuts, Color"
+    assert jsonld_fields(ld({"@type": "LocalBusiness", "hasOfferCatalog": "Haircuts"}))["services_list"] == "Haircuts"
+
+
+def test_payment_methods_as_objects():
+    fields = jsonld_fields(ld({
+        "@type": "LocalBusiness",
+        "paymentAccepted": [{"@type": "PaymentMethod", "name": "Visa"}, "Cash"],
+    }))
+    assert fields["payment_methods"] == "Visa, Cash"
+
+
+def test_invalid_json_is_skipped():
+    assert jsonld_fields(["{not json", json.dumps({"@type": "Organization", "name": "Acme"})]) == {
+        "company_name": "Acme",
+    }
+
+
+def test_fingerprint():
+    assert fingerprint({"x-wix-request-id": "1"}, {}) == "wix"
+    assert fingerprint({}, {"generator": "WordPress 6.4", "assets": []}) == "wordpress"
+    assert fingerprint({}, {"assets": ["https://cdn.shopify.com/s/theme.js"]}) == "shopify"
+    assert fingerprint({"server": "nginx"}, {"generator": "", "assets": []}) is None
+
+
+def test_squarespace_context():
+    content = {
+        "squarespace": {
+            "siteTitle": "Studio",
+            "timeZone": "America/Denver",
+            "location": {"addressLine1": "1 Main St", "addressLine2": "Denver, CO"},
+            "socialAccounts": [{"profileUrl": "https://instagram.com/studio"}],
+        },
+        "jsonld": [],
+    }
+    fields = structured_fields("squarespace", content, [])
+    assert fields["timezone"] == "America/Denver"
+    assert fields["address"] == "1 Main St, Denver, CO"
+    assert fields["instagram_url"] == "https://instagram.com/studio"
+
+
+class HeadRefusingSession:
+    """Answers 405 to every HEAD, like servers that do not implement it"""
+
+    def __init__(self, live_paths):
+        self.live_paths = live_paths
+
+    def head(self, url, **kwargs):
+        return SimpleNamespace(status_code=405, url=url)
+
+    def get(self, url, stream=False, **kwargs):
+        assert stream
+        status = 200 if urlparse(url).path in self.live_paths else 404
+        return SimpleNamespace(status_code=status, url=url, close=lambda: None)
+
+
+def test_live_routes_fall_back_to_get_when_head_is_refused():
+    pytest.importorskip("requests")
+    session = HeadRefusingSession({"/contact", "/pricing"})
+    assert live_routes("https://studio.com/", "squarespace", session) == [
+        "https://studio.com/contact", "https://studio.com/pricing",
+    ]
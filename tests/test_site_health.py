@@ -0,0 +1,40 @@
+import site_health
+from site_health import CircuitBreaker, check_site, get_breaker
+
+
+def test_breaker_opens_after_threshold_failures():
+    breaker = CircuitBreaker(threshold=3, cooldown=60)
+    assert not breaker.record_failure("acme.com")
+    breaker.record_success("acme.com")
+    assert not breaker.record_failure("acme.com")
+    assert not breaker.record_failure("acme.com")
+    assert breaker.blocked("acme.com") is None
+    assert breaker.record_failure("acme.com")
+    assert breaker.blocked("acme.com") == "3 page loads failed in a row"
+    assert breaker.blocked("other.org") is None
+
+
+def test_breaker_closes_after_cooldown():
+    breaker = CircuitBreaker(cooldown=60)
+    breaker.trip("acme.com", "DNS lookup failed", cooldown=-1)
+    assert breaker.blocked("acme.com") is None
+
+
+def test_failed_probe_is_cached_per_domain(monkeypatch):
+    probes = []
+
+    def probe(url):
+        probes.append(url)
+        return "DNS lookup failed" if "dead" in url else None
+
+    monkeypatch.setattr(site_health, "probe_site", probe)
+    assert check_site("https://dead.com/") == "DNS lookup failed"
+    assert check_site("https://www.dead.com/about") == "DNS lookup failed"
+    assert check_site("https://alive.com/") is None
+    assert check_site("https://alive.com/") is None
+    assert probes == ["https://dead.com/", "https://alive.com/", "https://alive.com/"]
+    assert get_breaker().blocked("dead.com") == "DNS lookup failed"
+
+
+def test_probe_leaves_bot_protection_statuses_to_the_browser():
+    assert not {403, 429, 503} & site_health.DEAD_STATUSES
@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from token_budget import TokenBudget, TokenBudgetExceeded
+
+MESSAGES = [{"role": "user", "content": "x" * 400}]
+
+
+def test_concurrent_preflights_cannot_overshoot(tmp_path):
+    budget = TokenBudget(batch_cap=1000, daily_cap=10 ** 9, usage_db=str(tmp_path / "usage.db"))
+
+    def call(_):
+        try:
+            return budget.preflight(MESSAGES, max_completion_tokens=200) + 200
+        except TokenBudgetExceeded:
+            return 0
+
+    reserved = [r for r in ThreadPoolExecutor(8).map(call, range(8)) if r]
+    assert sum(reserved) <= 1000
+    assert budget.reserved == sum(reserved)
+
+    for amount in reserved:
+        budget.record(amount - 50, amount)
+    assert budget.reserved == 0
+    assert budget.batch_tokens == sum(reserved) - 50 * len(reserved)
+    assert budget.daily_tokens() == budget.batch_tokens
+
+
+def test_release_frees_the_reservation(tmp_path):
+    budget = TokenBudget(batch_cap=500, daily_cap=10 ** 9, usage_db=str(tmp_path / "usage.db"))
+    reserved = budget.preflight(MESSAGES, max_completion_tokens=200) + 200
+    with pytest.raises(TokenBudgetExceeded):
+        budget.preflight(MESSAGES, max_completion_tokens=200)
+    budget.release(reserved)
+    budget.preflight(MESSAGES, max_completion_tokens=200)
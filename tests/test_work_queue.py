@@ -0,0 +1,75 @@
+import time
+
+from work_queue import SQLiteQueue, open_queue
+
+
+def make_queue(tmp_path, **kwargs):
+    return SQLiteQueue(str(tmp_path / "jobs.db"), **kwargs)
+
+
+def test_enqueue_ignores_duplicates(tmp_path):
+    queue = make_queue(tmp_path)
+    assert queue.enqueue(["https://a.com/", "https://b.com/"]) == 2
+    assert queue.enqueue(["https://a.com/"]) == 0
+    assert queue.stats() == {"pending": 2}
+
+
+def test_lease_is_exclusive_until_it_expires(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue(["https://a.com/"])
+    job_id, url, token = queue.lease("w1", lease_seconds=60)
+    assert url == "https://a.com/"
+    assert queue.lease("w2", lease_seconds=60) is None
+
+
+def test_expired_lease_is_reissued_and_stale_token_cannot_commit(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue(["https://a.com/"])
+    job_id, _, stale = queue.lease("w1", lease_seconds=0.01)
+    time.sleep(0.05)
+
+    assert not queue.heartbeat(job_id, "not-the-token")
+    again = queue.lease("w2", lease_seconds=60)
+    assert again is not None and again[0] == job_id
+    fresh = again[2]
+
+    assert not queue.heartbeat(job_id, stale)
+    assert not queue.complete(job_id, stale, {"company_name": "late"})
+    assert queue.complete(job_id, fresh, {"company_name": "Acme"})
+    assert not queue.complete(job_id, fresh, {"company_name": "twice"})
+    assert list(queue.results()) == [("https://a.com/", {"company_name": "Acme"})]
+
+
+def test_heartbeat_keeps_lease(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue(["https://a.com/"])
+    job_id, _, token = queue.lease("w1", lease_seconds=0.05)
+    assert queue.heartbeat(job_id, token, lease_seconds=60)
+    time.sleep(0.1)
+    assert queue.lease("w2") is None
+
+
+def test_fail_retries_until_attempts_run_out(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    queue.enqueue(["https://a.com/"])
+    for _ in range(2):
+        job_id, _, token = queue.lease("w1")
+        assert queue.fail(job_id, token, "boom")
+    assert queue.lease("w1") is None
+    assert queue.stats() == {"failed": 1}
+
+
+def test_release_does_not_count_an_attempt(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=1)
+    queue.enqueue(["https://a.com/"])
+    for _ in range(3):
+        job_id, _, token = queue.lease("w1")
+        assert queue.release(job_id, token)
+    job_id, _, token = queue.lease("w1")
+    assert queue.complete(job_id, token, {})
+    assert queue.stats() == {"done": 1}
+
+
+def test_open_queue_uri(tmp_path):
+    queue = open_queue(f"sqlite:///{tmp_path / 'q.db'}")
+    assert isinstance(queue, SQLiteQueue)
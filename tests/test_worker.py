@@ -0,0 +1,28 @@
+import json
+
+from profile_store import open_store, put_redirects
+from work_queue import open_queue
+from worker import export_results
+
+
+def test_export_reads_committed_results_from_the_queue(tmp_path):
+    put_redirects(open_store(), [("acme.com", "https://acme.com/"), ("old-acme.com", "https://acme.com/"),
+                                 ("other.org", "https://other.org/")])
+    queue_uri = f"sqlite:///{tmp_path / 'jobs.db'}"
+    queue = open_queue(queue_uri)
+    queue.enqueue(["https://acme.com/", "https://other.org/"])
+    job_id, url, token = queue.lease("remote-host")
+    assert url == "https://acme.com/"
+    queue.complete(job_id, token, {"company_name": "Acme"})
+
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text("# input\nwww.acme.com\nold-acme.com/contact\n\nother.org\nnot a url\n", encoding="utf-8")
+    export_results(queue_uri, str(url_file), str(tmp_path / "out.jsonl"))
+
+    rows = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert rows == [
+        {"input": "www.acme.com", "site": "https://acme.com/", "profile": {"company_name": "Acme"}},
+        {"input": "old-acme.com/contact", "site": "https://acme.com/", "profile": {"company_name": "Acme"}},
+        {"input": "other.org", "site": "https://other.org/", "profile": None},
+        {"input": "not a url", "site": None, "profile": None},
+    ]
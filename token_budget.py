@@ -0,0 +1,202 @@
+import math
+import os
+import sqlite3
+import threading
+from datetime import date
+from functools import lru_cache
+
+# USD per 1K tokens as (prompt, completion)
+MODEL_PRICING = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+}
+
+BATCH_TOKEN_CAP = int(os.getenv("BATCH_TOKEN_CAP", "2000000"))
+DAILY_TOKEN_CAP = int(os.getenv("DAILY_TOKEN_CAP", "10000000"))
+EXTRACTION_PROMPT_TOKEN_LIMIT = int(os.getenv("EXTRACTION_PROMPT_TOKEN_LIMIT", "6000"))
+USAGE_DB_PATH = os.getenv("TOKEN_USAGE_DB", "token_usage.db")
+
+# Typical completion sizes used for projections
+EXTRACTION_COMPLETION_ESTIMATE = 700
+ANALYSIS_COMPLETION_ESTIMATE = 800
+
+CHARS_PER_TOKEN = 4
+
+
+class TokenBudgetExceeded(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text, model="gpt-3.5-turbo"):
+    """Count tokens locally with tiktoken, or estimate from length when it is not installed"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages, model="gpt-3.5-turbo"):
+    """Prompt tokens for a chat request, including per-message overhead"""
+    return sum(count_tokens(m["content"], model) + 4 for m in messages) + 3
+
+
+def trim_to_tokens(text, max_tokens, model="gpt-3.5-turbo"):
+    """Cut text down to at most max_tokens tokens"""
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def estimate_cost(prompt_tokens, completion_tokens, model="gpt-3.5-turbo"):
+    prompt_price, completion_price = MODEL_PRICING.get(model, MODEL_PRICING["gpt-4"])
+    return prompt_tokens / 1000 * prompt_price + completion_tokens / 1000 * completion_price
+
+
+class TokenBudget:
+    """Running per-batch and per-day token totals with hard caps
+
+    The batch total lives in memory for the lifetime of the process; the daily total is
+    kept in SQLite so every process on the machine counts against the same cap. Workers
+    on separate hosts each get their own daily cap unless TOKEN_USAGE_DB points at a
+    shared file, or a subclass backed by a shared store is installed with set_budget.
+
+    preflight reserves a request's estimate before the call so concurrent requests cannot
+    all pass the check and overshoot together; record or release settles the reservation.
+    """
+
+    def __init__(self, batch_cap=BATCH_TOKEN_CAP, daily_cap=DAILY_TOKEN_CAP, usage_db=USAGE_DB_PATH):
+        self.batch_cap = batch_cap
+        self.daily_cap = daily_cap
+        self.batch_tokens = 0
+        self.reserved = 0
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(usage_db, timeout=30, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS usage (day TEXT PRIMARY KEY, tokens INTEGER NOT NULL)")
+
+    def daily_tokens(self):
+        with self.lock:
+            row = self.conn.execute("SELECT tokens FROM usage WHERE day = ?", (date.today().isoformat(),)).fetchone()
+        return row[0] if row else 0
+
+    def check(self, tokens):
+        """Raise TokenBudgetExceeded if spending tokens would break a cap"""
+        with self.lock:
+            used = self.batch_tokens + self.reserved
+            if used + tokens > self.batch_cap:
+                raise TokenBudgetExceeded(
+                    f"Batch token cap reached ({used} used or reserved + {tokens} requested > {self.batch_cap})"
+                )
+            daily = self.daily_tokens() + self.reserved
+            if daily + tokens > self.daily_cap:
+                raise TokenBudgetExceeded(
+                    f"Daily token cap reached ({daily} used or reserved + {tokens} requested > {self.daily_cap})"
+                )
+
+    def preflight(self, messages, model="gpt-3.5-turbo", max_completion_tokens=0):
+        """Check a request against the caps and reserve prompt + max_completion_tokens
+
+        Returns the estimated prompt tokens. Settle the reservation with
+        record(actual, reserved=prompt + max_completion_tokens) or release(...) on failure.
+        """
+        prompt_tokens = count_message_tokens(messages, model)
+        with self.lock:
+            self.check(prompt_tokens + max_completion_tokens)
+            self.reserved += prompt_tokens + max_completion_tokens
+        return prompt_tokens
+
+    def release(self, reserved):
+        with self.lock:
+            self.reserved = max(self.reserved - reserved, 0)
+
+    def record(self, tokens, reserved=0):
+        with self.lock, self.conn:
+            self.reserved = max(self.reserved - reserved, 0)
+            self.batch_tokens += tokens
+            self.conn.execute(
+                "INSERT INTO usage (day, tokens) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET tokens = tokens + excluded.tokens",
+                (date.today().isoformat(), tokens),
+            )
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_budget():
+    """Process-wide budget shared by every LLM call"""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = TokenBudget()
+    return _budget
+
+
+def set_budget(budget):
+    """Install another budget, e.g. one whose daily total lives in a store shared across hosts"""
+    global _budget
+    with _budget_lock:
+        _budget = budget
+
+
+def project_batch_cost(url_count, model=None, analysis_model=None, escalate=True):
+    """Projected tokens and cost for extracting (and optionally analysing) url_count sites
+
+    model defaults to the first extraction tier; unless escalate is False (single-model
+    runs such as offline batches), the expected share of sites escalated to the last
+    tier is added on top, each escalation resending the page text.
+    """
+    from model_router import EXPECTED_ESCALATION_SHARE, EXTRACTION_TIERS
+    from scraper import MAX_TEXT_CHARS, build_extraction_messages
+
+    model = model or EXTRACTION_TIERS[0]
+    # Instructions plus a full-size crawl excerpt
+    overhead = count_message_tokens(build_extraction_messages(""), model)
+    extraction_prompt = min(overhead + math.ceil(MAX_TEXT_CHARS / CHARS_PER_TOKEN), EXTRACTION_PROMPT_TOKEN_LIMIT)
+    prompt_tokens = extraction_prompt
+    completion_tokens = EXTRACTION_COMPLETION_ESTIMATE
+    cost = estimate_cost(prompt_tokens, completion_tokens, model)
+
+    escalation_model = EXTRACTION_TIERS[-1]
+    if escalate and escalation_model != model:
+        prompt_tokens += extraction_prompt * EXPECTED_ESCALATION_SHARE
+        completion_tokens += EXTRACTION_COMPLETION_ESTIMATE * EXPECTED_ESCALATION_SHARE
+        cost += EXPECTED_ESCALATION_SHARE * estimate_cost(
+            extraction_prompt, EXTRACTION_COMPLETION_ESTIMATE, escalation_model
+        )
+
+    if analysis_model:
+        # The analysis prompt is roughly the rendered template plus the instructions
+        analysis_prompt_tokens = extraction_prompt
+        prompt_tokens += analysis_prompt_tokens
+        completion_tokens += ANALYSIS_COMPLETION_ESTIMATE
+        cost += estimate_cost(analysis_prompt_tokens, ANALYSIS_COMPLETION_ESTIMATE, analysis_model)
+
+    total = math.ceil((prompt_tokens + completion_tokens) * url_count)
+    return {
+        "urls": url_count,
+        "prompt_tokens": math.ceil(prompt_tokens * url_count),
+        "completion_tokens": math.ceil(completion_tokens * url_count),
+        "total_tokens": total,
+        "cost_usd": round(cost * url_count, 4),
+    }
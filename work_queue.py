@@ -0,0 +1,181 @@
+import json
+import sqlite3
+import time
+import uuid
+
+DEFAULT_QUEUE_URI = "sqlite:///jobs.db"
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class QueueBackend:
+    """Work-queue protocol shared by every backend
+
+    A job is leased to one worker at a time. The lease carries a token; the worker must
+    heartbeat before the lease expires and present the same token to commit its result.
+    Expired leases are handed out again, and a stale token can never commit, so each
+    job's result is committed exactly once.
+    """
+
+    def enqueue(self, urls):
+        raise NotImplementedError
+
+    def lease(self, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Return (job_id, url, lease_token) or None when nothing is available"""
+        raise NotImplementedError
+
+    def heartbeat(self, job_id, lease_token, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Extend a lease; False means the lease was lost"""
+        raise NotImplementedError
+
+    def complete(self, job_id, lease_token, result):
+        """Commit a result; False means another worker owns the job now"""
+        raise NotImplementedError
+
+    def fail(self, job_id, lease_token, error):
+        raise NotImplementedError
+
+    def release(self, job_id, lease_token):
+        """Give a leased job back untouched, without counting the attempt"""
+        raise NotImplementedError
+
+    def results(self):
+        """Yield (url, result) for every committed job"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Job counts by status"""
+        raise NotImplementedError
+
+
+class SQLiteQueue(QueueBackend):
+    """Queue stored in a single SQLite file (one box, or a shared filesystem with proper locking)"""
+
+    def __init__(self, path, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY,
+            url TEXT NOT NULL UNIQUE,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_token TEXT,
+            leased_by TEXT,
+            lease_expires REAL,
+            result TEXT,
+            error TEXT,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, lease_expires);
+        """)
+
+    def enqueue(self, urls):
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO jobs (url, updated_at) VALUES (?, ?)",
+                [(url, now) for url in urls],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount
+
+    def lease(self, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        token = uuid.uuid4().hex
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Jobs whose lease ran out on their last allowed attempt are given up on
+            self.conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired', lease_token = NULL, updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = self.conn.execute(
+                "SELECT id, url FROM jobs "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_token = ?, "
+                "leased_by = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                (token, worker_id, now + lease_seconds, now, row[0]),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return row[0], row[1], token
+
+    def heartbeat(self, job_id, lease_token, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+            (now + lease_seconds, now, job_id, lease_token),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, lease_token, result):
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_token = NULL, updated_at = ? "
+            "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+            (json.dumps(result, ensure_ascii=False), time.time(), job_id, lease_token),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, lease_token, error):
+        # Retry until attempts run out, then park the job as failed
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, lease_token = NULL, updated_at = ? "
+            "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+            (self.max_attempts, str(error), time.time(), job_id, lease_token),
+        )
+        return cursor.rowcount == 1
+
+    def release(self, job_id, lease_token):
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = 'pending', attempts = MAX(attempts - 1, 0), lease_token = NULL, "
+            "leased_by = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+            (time.time(), job_id, lease_token),
+        )
+        return cursor.rowcount == 1
+
+    def results(self):
+        for url, result in self.conn.execute("SELECT url, result FROM jobs WHERE status = 'done' ORDER BY id"):
+            yield url, json.loads(result)
+
+    def stats(self):
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+BACKENDS = {"sqlite": SQLiteQueue}
+
+
+def register_backend(scheme, backend_class):
+    """Make a QueueBackend subclass available under a URI scheme"""
+    BACKENDS[scheme] = backend_class
+
+
+def open_queue(uri=DEFAULT_QUEUE_URI):
+    """Open a queue from a URI such as sqlite:///jobs.db (a bare path means SQLite)"""
+    scheme, sep, location = uri.partition("://")
+    if not sep:
+        scheme, location = "sqlite", uri
+    elif scheme == "sqlite":
+        location = location[1:] if location.startswith("/") else location
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unknown queue backend: {scheme}")
+    return BACKENDS[scheme](location)
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import signal
+import socket
+import threading
+import time
+
+from token_budget import BATCH_TOKEN_CAP, DAILY_TOKEN_CAP, TokenBudgetExceeded, project_batch_cost
+from work_queue import DEFAULT_LEASE_SECONDS, DEFAULT_QUEUE_URI, open_queue
+
+
+def heartbeat_loop(queue_uri, job_id, lease_token, lease_seconds, stop):
+    """Keep a lease alive from a separate connection while the job runs"""
+    queue = open_queue(queue_uri)
+    while not stop.wait(lease_seconds / 3):
+        if not queue.heartbeat(job_id, lease_token, lease_seconds):
+            print(f"⚠️  Lost lease on job {job_id}")
+            return
+
+
+def run_worker(queue_uri=DEFAULT_QUEUE_URI, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS,
+               max_pages=8, poll_interval=5, exit_when_empty=False, use_store=True, parquet_dir=None):
+    """Lease URLs from the queue and scrape them until stopped"""
+    from scraper import scrape_business_info_with_sources
+    from profile_store import open_store, save_crawl, is_empty_profile
+
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = open_queue(queue_uri)
+    store = open_store() if use_store else None
+    print(f"👷 Worker {worker_id} polling {queue_uri}")
+
+    # Numbered Parquet parts per worker run, each published once full; readers scan the
+    # whole directory as a dataset
+    parquet = None
+    if parquet_dir:
+        from parquet_export import RollingParquetWriter
+        parquet = RollingParquetWriter(parquet_dir, f"profiles-{worker_id}-{int(time.time())}")
+
+    try:
+        while True:
+            job = queue.lease(worker_id, lease_seconds)
+            if job is None:
+                if exit_when_empty:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            job_id, url, lease_token = job
+            stop = threading.Event()
+            beat = threading.Thread(
+                target=heartbeat_loop,
+                args=(queue_uri, job_id, lease_token, lease_seconds, stop),
+                daemon=True,
+            )
+            beat.start()
+            timings = {}
+            try:
+                result, pages, sources = scrape_business_info_with_sources(url, max_pages=max_pages, timings=timings)
+            except TokenBudgetExceeded as e:
+                # A cap is a pause, not a failure: hand the job back without using up an attempt
+                queue.release(job_id, lease_token)
+                print(f"🛑 Token budget exceeded, stopping worker: {e}")
+                break
+            except Exception as e:
+                queue.fail(job_id, lease_token, e)
+                print(f"❌ {url}: {e}")
+                continue
+            finally:
+                stop.set()
+                beat.join()
+
+            if is_empty_profile(result):
+                queue.fail(job_id, lease_token, "no data extracted")
+                print(f"❌ {url}: no data extracted")
+            elif queue.complete(job_id, lease_token, result.to_dict()):
+                if store is not None:
+                    save_crawl(store, url, result, pages, sources)
+                if parquet is not None:
+                    parquet.write(url, result, timings)
+                print(f"✅ {url} ({timings.get('total_seconds', 0):.1f}s)")
+            else:
+                print(f"⏭️  {url}: lease expired, result discarded")
+    finally:
+        if parquet is not None:
+            parquet.close()
+
+    print(f"📊 Queue status: {queue.stats()}")
+
+
+def read_url_file(path):
+    """Input rows of a URL file: one per line, blank lines and # comments skipped"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def enqueue_file(queue_uri, path):
+    """Add one URL per line from a text file to the queue"""
+    from canonical_urls import collapse_sites
+    from profile_store import open_store
+
+    urls = read_url_file(path)
+    
+    # Collapse aliases (www., http://, paths, redirects) so each site is crawled once
+    sites, site_for = collapse_sites(urls, open_store())
+    print(f"🔗 {len(urls)} input row(s) → {len(sites)} unique site(s) ({len(urls) - len(site_for)} invalid)")
+    
+    added = open_queue(queue_uri).enqueue(sites)
+    print(f"📥 Queued {added} new site(s) ({len(sites) - added} already queued)")
+    
+    projection = project_batch_cost(added)
+    print(f"💰 Projected usage: ~{projection['total_tokens']:,} tokens (~${projection['cost_usd']:.2f})")
+    if projection['total_tokens'] > min(BATCH_TOKEN_CAP, DAILY_TOKEN_CAP):
+        print(f"⚠️  Projection exceeds the token caps (batch {BATCH_TOKEN_CAP:,}, daily {DAILY_TOKEN_CAP:,}); "
+              "workers will stop when a cap is reached")
+
+
+def export_results(queue_uri, path, output):
+    """Write one JSON line per input row with the profile of the site it collapsed to
+
+    Results come from the queue, the one record every host commits to, not the local store.
+    """
+    from canonical_urls import collapse_sites
+    from profile_store import open_store
+
+    urls = read_url_file(path)
+    # Same collapsing as enqueue, so each row maps to the site that was queued for it
+    _, site_for = collapse_sites(urls, open_store())
+    results = dict(open_queue(queue_uri).results())
+
+    found = 0
+    with open(output, 'w', encoding='utf-8') as out:
+        for url in urls:
+            site = site_for.get(url)
+            profile = results.get(site)
+            found += profile is not None
+            row = {"input": url, "site": site, "profile": profile}
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    print(f"💾 Exported {found} of {len(urls)} row(s) to {output}")
+
+
+def main():
+    # Let `kill` stop a worker like Ctrl+C does, so the open Parquet part is still finished
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    parser = argparse.ArgumentParser(description="Distributed scrape/extract worker")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_URI, help="Queue URI, e.g. sqlite:///jobs.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="Queue URLs from a file (one per line)")
+    enqueue.add_argument("url_file")
+
+    work = sub.add_parser("work", help="Run a worker")
+    work.add_argument("--worker-id")
+    work.add_argument("--lease-seconds", type=int, default=DEFAULT_LEASE_SECONDS)
+    work.add_argument("--max-pages", type=int, default=8)
+    work.add_argument("--poll-interval", type=float, default=5)
+    work.add_argument("--exit-when-empty", action="store_true")
+    work.add_argument("--no-store", action="store_true", help="Do not write results to the profile store")
+    work.add_argument("--parquet-dir", help="Also append results to a Parquet file in this directory")
+
+    export = sub.add_parser("export", help="Write results for every row of an input URL file")
+    export.add_argument("url_file")
+    export.add_argument("output", help="JSONL output path")
+
+    sub.add_parser("status", help="Show job counts")
+
+    args = parser.parse_args()
+    if args.command == "enqueue":
+        enqueue_file(args.queue, args.url_file)
+    elif args.command == "work":
+        run_worker(args.queue, args.worker_id, args.lease_seconds, args.max_pages,
+                   args.poll_interval, args.exit_when_empty, not args.no_store, args.parquet_dir)
+    elif args.command == "export":
+        export_results(args.queue, args.url_file, args.output)
+    else:
+        from model_router import get_tier_stats
+
+        print(f"📊 Queue status: {open_queue(args.queue).stats()}")
+        for tier in get_tier_stats().summary():
+            print(f"🎯 {tier['tier']}: {tier['fields_accepted']}/{tier['fields_requested']} fields accepted "
+                  f"({tier['hit_rate']:.0%}) over {tier['calls']} call(s)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n⏹️  Worker stopped")